@@ -0,0 +1,117 @@
+""" Optional numba-compiled kernels for surrogate evaluation.
+
+numba is not a required dependency of gwsurrogate. If it cannot be imported
+numba_enabled is False and callers should use their NumPy code path instead;
+the kernels below are still defined but will run as (slow) pure Python.
+
+The kernels release the GIL and only write to arrays they are given or
+allocate, so threads may call them concurrently."""
+
+from __future__ import division # for python 2
+
+__copyright__    = "Copyright (C) 2014 Scott Field and Chad Galley"
+__email__        = "sfield@umassd.edu, crgalley@tapir.caltech.edu"
+__status__       = "testing"
+__author__       = "Jonathan Blackman, Scott Field, Chad Galley"
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import numpy as np
+import math
+
+try:
+  from numba import njit
+  numba_enabled = True
+except ImportError:
+  numba_enabled = False
+  def njit(*args, **kwargs):
+    """ no-op stand-in for numba.njit """
+    return lambda func: func
+
+
+#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+@njit(cache=True, nogil=True)
+def h_eim_polyval(amp_coeffs, phase_coeffs, norm_coeffs, has_norm, x_0):
+  """ EIM coefficients nrm*amp*exp(1j*phase) of a waveform_basis surrogate
+  whose amplitude, phase (and norm) fits are all polyval_1d.
+
+  Each row of amp_coeffs/phase_coeffs is a numpy.polyval coefficient vector,
+  evaluated at x_0 with Horner's rule. The coefficients are returned as a
+  real (dim_rb, 2) array whose columns are the real and imaginary parts."""
+
+  nrm = 1.0
+  if has_norm:
+    nrm = 0.0
+    for kk in range(norm_coeffs.shape[0]):
+      nrm = nrm*x_0 + norm_coeffs[kk]
+
+  dim_rb = amp_coeffs.shape[0]
+  h_EIM  = np.empty((dim_rb, 2))
+  for jj in range(dim_rb):
+    amp = 0.0
+    for kk in range(amp_coeffs.shape[1]):
+      amp = amp*x_0 + amp_coeffs[jj,kk]
+    phase = 0.0
+    for kk in range(phase_coeffs.shape[1]):
+      phase = phase*x_0 + phase_coeffs[jj,kk]
+    amp = nrm*amp
+    h_EIM[jj,0] = amp*math.cos(phase)
+    h_EIM[jj,1] = amp*math.sin(phase)
+
+  return h_EIM
+
+
+#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+@njit(cache=True, nogil=True, fastmath=True)
+def h_sur_fast_spline(B_re, B_im, h_re, h_im, nrm, hp, hc):
+  """ hp + 1j*hc = nrm*np.dot(B_re + 1j*B_im, h_re + 1j*h_im), written into
+  the preallocated hp, hc.
+
+  Used by waveform_basis surrogates with fast_spline_real/imag fits, whose
+  EIM coefficients are the fitted real and imaginary parts h_re, h_im. Each
+  output sample is a single pass over a row of B_re and B_im."""
+
+  dim_rb = B_re.shape[1]
+  for ii in range(B_re.shape[0]):
+    p = 0.0
+    q = 0.0
+    for jj in range(dim_rb):
+      p += B_re[ii,jj]*h_re[jj] - B_im[ii,jj]*h_im[jj]
+      q += B_re[ii,jj]*h_im[jj] + B_im[ii,jj]*h_re[jj]
+    hp[ii] = nrm*p
+    hc[ii] = nrm*q
+
+
+#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+@njit(cache=True, nogil=True, fastmath=True)
+def accumulate_mode(hp, hc, coef, h, hc_sign=1.0):
+  """ h += coef*(hp + 1j*hc_sign*hc) for the complex scalar coef, in place.
+  hc_sign=-1 adds coef times the conjugate of hp + 1j*hc.
+
+  Used to sum modes on the sphere; the complex mode and its product with coef
+  are never formed, so each sample is a single pass over hp, hc and h."""
+
+  c_re = coef.real
+  c_im = coef.imag
+  d_re = c_re*hc_sign
+  d_im = c_im*hc_sign
+  for ii in range(h.shape[0]):
+    h[ii] += complex(c_re*hp[ii] - d_im*hc[ii], d_re*hc[ii] + c_im*hp[ii])
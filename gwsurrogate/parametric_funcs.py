@@ -184,6 +184,62 @@ def BHPT_nrcalib_functional_form(x,a,b,c,d):
     """
     return 1 + a*x + b*x**2 + c*x**3 + d*x**4
 
+
+### batched versions of the fitting functions ###
+# Each row of the 2D coeffs array is the coefficient vector that would be
+# passed to the single-fit function above. These are evaluated for all rows at
+# once and return one value per row, avoiding a Python loop over the basis.
+
+#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+def _horner_batch(coeffs,x):
+  """ numpy.polyval(coeffs[jj,:],x) for all rows jj (Horner's rule)"""
+  y = 0.
+  for pv in coeffs.T:
+    y = y*x + pv
+  return y
+
+#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+def polyval_1d_batch(coeffs,x):
+  """ batched polyval_1d """
+  return _horner_batch(coeffs, x)
+
+#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+def ampfitfn1_1d_batch(coeffs,x):
+  """ batched ampfitfn1_1d """
+  nu = gwtools.q_to_nu(x)
+  return coeffs[:,0] + coeffs[:,1]*nu**coeffs[:,2]
+
+#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+def ampfitfn2_1d_batch(coeffs,x):
+  """ batched ampfitfn2_1d """
+  nu = gwtools.q_to_nu(x)
+  return coeffs[:,0] + coeffs[:,1]*np.abs(0.25-nu)**0.5 + coeffs[:,2]*np.log(nu/0.25)
+
+#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+def phifitfn1_1d_batch(coeffs,x):
+  """ batched phifitfn1_1d """
+  nu = gwtools.q_to_nu(x)
+  return coeffs[:,0] + coeffs[:,1]*nu + coeffs[:,2]*nu**2 + coeffs[:,3]*np.log(nu)
+
+#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+def ampfitfn4_1d_batch(coeffs,x):
+  """ batched ampfitfn4_1d """
+  a0, a1, a2, a3 = coeffs[:,0], coeffs[:,1], coeffs[:,2], coeffs[:,3]
+  return a0*np.sqrt(1.0-x) + a1*(1.0-x) + a2*np.power(1.0-x,2) + a3*np.power(1.0-x,3)
+
+#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+def ampfitfn5_1d_batch(coeffs,x):
+  """ batched ampfitfn5_1d """
+  a0 = coeffs[:,-1]
+  return a0*np.sqrt(1. - x) + _horner_batch(coeffs[:,:-1],1. - x)*(1. - x)
+
+#!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+def ampfitfn6_1d_batch(coeffs,x):
+  """ batched ampfitfn6_1d """
+  a0 = coeffs[:,-1]
+  a1 = coeffs[:,-2]
+  return a0*np.sqrt(1. - x) + a1*(1. - x)**1.5 + _horner_batch(coeffs[:,:-2],1. - x)*(1. - x)
+
 #-
 ### dictionary of fitting functions ###
 function_dict = {
@@ -203,3 +259,14 @@ function_dict = {
                  "q_to_logq": q_to_logq,
                  "q_to_log10q": q_to_log10q
                  }
+
+### dictionary of batched fitting functions (keys match function_dict) ###
+batch_function_dict = {
+                 "polyval_1d": polyval_1d_batch,
+                 "ampfitfn1_1d": ampfitfn1_1d_batch,
+                 "ampfitfn2_1d": ampfitfn2_1d_batch,
+                 "ampfitfn4_1d": ampfitfn4_1d_batch,
+                 "phifitfn1_1d": phifitfn1_1d_batch,
+                 "nuSingularPlusPolynomial": ampfitfn5_1d_batch,
+                 "nuSingular2TermsPlusPolynomial": ampfitfn6_1d_batch,
+                 }
@@ -31,37 +31,57 @@ THE SOFTWARE.
 # so they won't show up in gws' tab completion
 import numpy as np
 from scipy.interpolate import splrep as _splrep
-from scipy.interpolate import splev as _splev
+from scipy.interpolate import BSpline as _BSpline
+from scipy.interpolate import make_interp_spline as _make_interp_spline
+from scipy.fft import next_fast_len as _next_fast_len
+from numpy.polynomial.polynomial import polyval as _polyval
 from gwtools.harmonics import sYlm as _sYlm
 from gwtools import plot_pretty as _plot_pretty
 from gwtools import gwtools as _gwtools # from the package gwtools, import the module gwtools (gwtools.py)....
 from gwtools import gwutils as _gwutils
 from .parametric_funcs import function_dict as my_funcs
+from .parametric_funcs import batch_function_dict as my_batch_funcs
+from ._kernels import numba_enabled as _numba_enabled
+from ._kernels import h_eim_polyval as _h_eim_polyval
+from ._kernels import h_sur_fast_spline as _h_sur_fast_spline
+from ._kernels import accumulate_mode as _accumulate_mode
 from .surrogateIO import H5Surrogate as _H5Surrogate
 from .surrogateIO import TextSurrogateRead as _TextSurrogateRead
 from .surrogateIO import TextSurrogateWrite as _TextSurrogateWrite
 from .surrogateIO import BHPTNRCalibValues as _BHPTNRCalibValues
+from .surrogateIO import open_h5 as _open_h5
+from .surrogateIO import read_mode_manifest as _read_mode_manifest
 from gwsurrogate.new.surrogate import ParamDim, ParamSpace
 
 import warnings
 import os
+import threading as _threading
+import collections
+import collections.abc
+import functools
 
 from .new import surrogate as new_surrogate
 from .new import precessing_surrogate
 from . import catalog
 from .catalog import get_modelID_from_filename
 
-try:
-  import matplotlib.pyplot as plt
-except:
-  print("Cannot load matplotlib.")
-
 try:
   import h5py
   h5py_enabled = True
 except ImportError:
   h5py_enabled = False
 
+try:
+  import numexpr as _ne
+  _numexpr_enabled = True
+except ImportError:
+  _numexpr_enabled = False
+
+try:
+  from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+except ImportError: # python 2 without the futures backport
+  _ThreadPoolExecutor = None
+
 
 # needed to search for single mode surrogate directories
 def _list_folders(path,prefix):
@@ -71,16 +91,47 @@ def _list_folders(path,prefix):
     if f.startswith(prefix):
       yield f
 
+# numexpr's multithreaded (and VML, if available) sin/cos only pays off for
+# large arrays, such as EIM coefficients of many parameter values at once
+_numexpr_min_size = 10000
+
+# helper function
+def _amp_cis(amp, phase, out):
+  '''writes amp*cos(phase), amp*sin(phase) into out[...,0], out[...,1]'''
+  if _numexpr_enabled and amp.size >= _numexpr_min_size:
+    _ne.evaluate('amp*cos(phase)', out=out[...,0])
+    _ne.evaluate('amp*sin(phase)', out=out[...,1])
+  else:
+    np.multiply(amp, np.cos(phase, out=out[...,0]), out=out[...,0])
+    np.multiply(amp, np.sin(phase, out=out[...,1]), out=out[...,1])
+  return out
+
+# single mode folders of a text surrogate, from its manifest if it has one
+def _list_mode_folders(path):
+  '''returns ((ell, m), folder) for each single mode surrogate folder'''
+  manifest = _read_mode_manifest(path)
+  if manifest is not None:
+    return manifest
+  # assumes (i) single mode folder format l#_m#_
+  #         (ii) ell<=9, m>=0
+  return [((int(f[1]), int(f[4])), f) for f in _list_folders(path,'l')]
+
 # handy helper to save waveforms
 def write_waveform(t, hp, hc, filename='output',ext='bin'):
-  """write waveform to text or numpy binary file"""
+  """write waveform to text or numpy binary file as a (3, N) array whose rows
+  are t, hp and hc"""
+
+  if ext not in ['txt', 'bin']:
+    raise ValueError('not a valid file extension')
+
+  # fill a single (3, N) array rather than letting numpy stack a list
+  data = np.empty((3, np.size(t)), dtype=np.result_type(t, hp, hc))
+  data[0], data[1], data[2] = t, hp, hc
 
   if( ext == 'txt'):
-    np.savetxt(filename, [t, hp, hc])
-  elif( ext == 'bin'):
-    np.save(filename, [t, hp, hc])
+    np.savetxt(filename, data, fmt='%.18e')
   else:
-    raise ValueError('not a valid file extension')
+    np.save(filename, data)
 
 
 ##############################################
@@ -104,7 +155,20 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
 
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-  def __init__(self, path, deg=3, subdir='', closeQ=True):
+  def __init__(self, path, deg=3, subdir='', closeQ=True, basis_dtype=np.float64,
+               basis_mmap=False, fit_dtype=np.float64, text_cache=None):
+    """Loads a single-mode surrogate.
+
+    basis_dtype: float type used to store B_re, B_im and evaluate their product
+        with the EIM coefficients on the surrogate's time grid. Use np.float32
+        to halve the memory traffic of waveform_basis evaluations at the cost of
+        single precision (~1e-7 relative) errors. See EvaluateSurrogate.
+    basis_mmap: if True, B_re and B_im are memory mapped read-only from a .npy
+        file written next to the surrogate data. See EvaluateSurrogate.
+    fit_dtype: float type used to store the coefficients of polyval_1d fits.
+        See EvaluateSurrogate.
+    text_cache: directory to cache the data of text surrogates in. See
+        EvaluateSurrogate."""
 
     # Load HDF5 or Text surrogate data depending on input file extension
     if type(path) == h5py._hl.files.File:
@@ -114,7 +178,7 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
     if ext == 'hdf5' or ext == 'h5':
       _H5Surrogate.__init__(self, file=path, mode='r', subdir=subdir, closeQ=closeQ)
     else:
-      _TextSurrogateRead.__init__(self, path)
+      _TextSurrogateRead.__init__(self, path, text_cache=text_cache)
     
     # For models that include the NR calibration info as one of the keys of the h5 file,
     # we need to call the following class
@@ -124,19 +188,212 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
       self.nrcalib = _BHPTNRCalibValues(file=path.filename)
     else:
       self.nrcalib = None
+
+    # surrogates parameterized by q itself need no change of coordinates
+    self._identity_params = self.parameterization == 'q_to_q'
+
+    # the affine map to the fits' standard interval as x_0 = slope*x + offset
+    x_min, x_max = self.fit_interval
+    self._x_min, self._x_max = float(x_min), float(x_max)
+    if self.affine_map == 'minus1_to_1':
+      self._affine_slope  = 2./(x_max - x_min)
+      self._affine_offset = -1. - 2.*x_min/(x_max - x_min)
+    elif self.affine_map == 'zero_to_1':
+      self._affine_slope  = 1./(x_max - x_min)
+      self._affine_offset = -x_min/(x_max - x_min)
+    elif self.affine_map == 'none':
+      self._affine_slope  = 1.
+      self._affine_offset = 0.
+    else:
+      raise ValueError('unknown affine map')
+
+    # Batched fit evaluators (all basis functions at once) when available.
+    # Surrogates using spline or fast_spline fits fall back to the per-basis loop
+    self.amp_fit_func_batch   = my_batch_funcs.get(self.fit_type_amp)
+    self.phase_fit_func_batch = my_batch_funcs.get(self.fit_type_phase)
+
+    # polyval_1d fits of all basis functions are evaluated by a single call to
+    # numpy.polynomial's polyval. Its coefficients are ordered by increasing
+    # degree, so store the fitparams transposed to (deg+1, dim_rb) and reversed
+    self._fitparams_amp_T   = self._polyval_coeffs(self.fit_type_amp, self.fitparams_amp, fit_dtype)
+    self._fitparams_phase_T = self._polyval_coeffs(self.fit_type_phase, self.fitparams_phase, fit_dtype)
+    if self.norms:
+      self._fitparams_norm_T = self._polyval_coeffs(self.fit_type_norm, self.fitparams_norm, fit_dtype)
+    else:
+      self._fitparams_norm_T = None
+
+    # Polynomial-fit waveform_basis surrogates can bypass the Python-level fit
+    # evaluation: with numba available, the EIM coefficients are computed in a
+    # single compiled kernel (see _eim_coeffs_reim)
+    # (compiled evaluation always uses the double precision fit coefficients)
+    polyval_fits = self.surrogate_mode_type == 'waveform_basis' \
+      and self.fit_type_amp == 'polyval_1d' and self.fit_type_phase == 'polyval_1d' \
+      and (not self.norms or self.fit_type_norm == 'polyval_1d') \
+      and np.dtype(fit_dtype) == np.float64
+    self._use_jit_eim = polyval_fits and _numba_enabled
+
+    # with numba, fast_spline fits of the real and imaginary parts are combined
+    # with the basis in one compiled loop (see _h_sur)
+    self._use_jit_fast_spline = _numba_enabled \
+      and self.surrogate_mode_type == 'waveform_basis' \
+      and self.fit_type_amp == 'fast_spline_real'
+    if polyval_fits:
+      self._poly_fitparams_amp   = np.ascontiguousarray(self.fitparams_amp, dtype=np.float64)
+      self._poly_fitparams_phase = np.ascontiguousarray(self.fitparams_phase, dtype=np.float64)
+      if self.norms:
+        self._poly_fitparams_norm = np.ascontiguousarray(np.atleast_1d(self.fitparams_norm), dtype=np.float64)
+      else:
+        self._poly_fitparams_norm = np.zeros(0)
+
+    # design matrices of the basis splines at recently requested times, most
+    # recent first (see _design_matrix)
+    self._design_cache = []
+
+    # resampled bases are zero outside of this interval (see _outside_interval),
+    # allowing for extrapolation if very close to surrogate's temporal interval
+    t0, t1 = self.times[0], self.times[-1]
+    self._t_interval = (t0 - 1.e-12*max(abs(t0), 1.), t1 + 1.e-12*max(abs(t1), 1.))
+
+    # orthogonal (B V) and waveform (B V R) bases, computed on first use by basis()
+    self._BV  = None
+    self._BVR = None
     
     # Interpolate columns of the empirical interpolant operator, B, using cubic spline
+    # .npy file B_re, B_im are memory mapped from and the file it is derived from
+    self._B_reim_cache = None
+    if basis_mmap:
+      if ext == 'hdf5' or ext == 'h5':
+        source = path.filename if type(path) == h5py._hl.files.File else path
+        cache  = source+'.'+subdir.strip('/') if subdir else source
+      else:
+        source = path+self._B_1_txt
+        cache  = path+'B'
+      self._B_reim_cache = (cache+'.B_reim_%s.npy'%np.dtype(basis_dtype).name, source)
+
     if self.surrogate_mode_type  == 'waveform_basis':
-      self.reB_spline_params = [_splrep(self.times, self.B[:,jj].real, k=deg) for jj in range(self.B.shape[1])]
-      self.imB_spline_params = [_splrep(self.times, self.B[:,jj].imag, k=deg) for jj in range(self.B.shape[1])]
+      self._setup_B_soa(basis_dtype)
+      # splines are built from the double precision B whatever basis_dtype is
+      self._setup_B_spline(deg)
+      # a double precision B_re, B_im hold B exactly, so drop the complex copy
+      if self.B_re.dtype == np.float64:
+        self._B = None
     elif self.surrogate_mode_type in ['amp_phase_basis', 'coorb_waveform_basis']:
-      self.B1_spline_params = [_splrep(self.times, self.B_1[:,jj], k=deg) for jj in range(self.B_1.shape[1])]
-      self.B2_spline_params = [_splrep(self.times, self.B_2[:,jj], k=deg) for jj in range(self.B_2.shape[1])]
+      self._B1_spline = self._batched_spline(self.B_1, deg)
+      self._B2_spline = self._batched_spline(self.B_2, deg)
     else:
       raise ValueError('invalid surrogate type')
 
+    # _h_sur for this surrogate's mode type, so it is not dispatched on each call
+    self._h_sur = getattr(self, '_h_sur_'+self.surrogate_mode_type)
+
     pass
 
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  @property
+  def B(self):
+    """complex empirical interpolant operator. Double precision waveform_basis
+       surrogates only store its real and imaginary parts, B_re and B_im
+       (see _setup_B_soa), and B is assembled from them on first access and
+       kept, as a complex copy of the basis, for later accesses."""
+
+    if getattr(self, '_B', None) is None and getattr(self, 'B_re', None) is not None:
+      self._B = self.B_re + 1j*self.B_im
+    return getattr(self, '_B', None)
+
+  @B.setter
+  def B(self, B):
+    self._B = B
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _setup_B_spline(self, deg):
+    """interpolate the columns of B with splines of degree deg.
+
+       All columns share the same knots, so the real and imaginary parts are
+       represented by one vector-valued spline with a (n_coef, 2*dim_rb)
+       coefficient table [real | imag], evaluated by resample_B."""
+
+    self._B_spline = self._batched_spline(np.concatenate((self.B.real, self.B.imag), axis=1), deg)
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _batched_spline(self, Y, deg):
+    """a single vector-valued BSpline interpolating every column of Y on times.
+
+       Odd degree splines are built by one make_interp_spline call, whose
+       not-a-knot splines have the same knots as splrep's interpolating ones.
+       make_interp_spline has no default knots for even degrees, which are
+       built column by column with splrep instead."""
+
+    if deg % 2 == 1:
+      return _make_interp_spline(self.times, Y, k=deg, axis=0)
+
+    coef_table = None
+    for jj, column in enumerate(np.ascontiguousarray(Y.T)):
+      t_knots, coefs, k_deg = _splrep(self.times, column, k=deg)
+      if coef_table is None:
+        n_coef = len(t_knots) - k_deg - 1
+        coef_table = np.empty((n_coef, Y.shape[1]))
+      coef_table[:,jj] = coefs[:n_coef]
+    return _BSpline(t_knots, coef_table, k_deg, axis=0)
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _setup_B_soa(self, dtype=np.float64):
+    """store the real and imaginary parts of B as contiguous real arrays.
+
+       B_re and B_im are views into a single (2, times, dim_rb) block so that
+       the waveform basis product only streams real data (see _B_dot).
+
+       With basis_mmap the block is memory mapped from a cache file, (re)written
+       if it is missing or older than the surrogate data, so that processes
+       loading the same surrogate share it through the page cache."""
+
+    B_reim = None
+    if self._B_reim_cache is not None:
+      cache, source = self._B_reim_cache
+      if os.path.isfile(cache) and os.stat(cache).st_mtime >= os.stat(source).st_mtime:
+        try:
+          B_reim = np.load(cache, mmap_mode='r')
+        except (IOError, ValueError):
+          pass # corrupted cache, rebuild it
+        if B_reim is not None and (B_reim.shape != (2,)+self.B.shape or B_reim.dtype != dtype):
+          B_reim = None
+
+    if B_reim is None:
+      B_reim = np.empty((2,)+self.B.shape, dtype=dtype)
+      B_reim[0] = self.B.real
+      B_reim[1] = self.B.imag
+      if self._B_reim_cache is not None:
+        try:
+          tmp = cache+'.%d.tmp'%os.getpid()
+          with open(tmp, 'wb') as fp:
+            np.save(fp, B_reim)
+          os.rename(tmp, cache)
+          B_reim = np.load(cache, mmap_mode='r')
+        except (IOError, OSError):
+          pass # not writable, keep the block in memory
+
+    self._B_reim = B_reim
+    self.B_re = self._B_reim[0]
+    self.B_im = self._B_reim[1]
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  @staticmethod
+  def _B_dot(B_re, B_im, h_EIM):
+    """compute the real and imaginary parts of np.dot(B_re + 1j*B_im, h)
+       with real matrix products.
+
+       h_EIM is a real (dim_rb, 2) or (dim_rb, N, 2) array holding the real
+       (h_EIM[...,0]) and imaginary (h_EIM[...,1]) parts of the coefficients."""
+
+    # match B's precision so that np.dot never upcasts (copies) a float32 B
+    h = h_EIM.reshape(h_EIM.shape[0], -1).astype(B_re.dtype, copy=False)
+    out_shape = (B_re.shape[0],) + h_EIM.shape[1:]
+    P = np.dot(B_re, h).reshape(out_shape)
+    Q = np.dot(B_im, h).reshape(out_shape)
+
+    hp = (P[...,0] - Q[...,1]).astype(np.float64, copy=False)
+    hc = (P[...,1] + Q[...,0]).astype(np.float64, copy=False)
+    return hp, hc
+
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
   def __call__(self, q, M=None, dist=None, phi_ref=None,\
                      f_low=None, times=None, units='dimensionless',\
@@ -171,6 +428,29 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
 
 
 
+    if self.surrogate_mode_type == 'coorb_waveform_basis' and singlemode_call:
+      msg = 'directly calling a coorb_waveform_basis surrogate will return a waveform in the co-orbital frame.\n'
+      msg += 'Please use EvaluateSurrogate to evaluate co-orbital frame surrogates.\n'
+      msg += 'Use EvaluateSurrogate call method to evaluate in the inertial frame.\n'
+      msg += 'Use EvaluateSurrogate.evaluate_single_mode to evaluate in the co-orbital frame.\n' 
+      raise ValueError(msg)
+
+    x, t, times, amp0 = self._setup_evaluation(q, M, dist, times, units)
+
+    ### Evaluate dimensionless single mode surrogates ###
+    hp, hc = self._h_sur(x, times=times)
+
+    return self._finish_evaluation(t, hp, hc, amp0, phi_ref=phi_ref, f_low=f_low)
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _setup_evaluation(self, q, M, dist, times, units):
+    """check the input of __call__ and map it to the surrogate's internal
+       parameter value x, the output times t, the dimensionless times (or
+       None) at which _h_sur is evaluated and the amplitude scaling amp0.
+
+       Shared by __call__ and EvaluateSurrogate's fused mode sum, which
+       must treat their input identically."""
+
     # Subsequent functions (e.g. code that checks evaluation point within training) assumes this
     assert(q>=1)
     
@@ -184,14 +464,6 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
     if (M is not None) and (dist is not None) and (times is not None) and (units != 'mks'):
     	raise ValueError('passing values of M, dist, and times suggest mks units should be used!')
 
-    if self.surrogate_mode_type == 'coorb_waveform_basis' and singlemode_call:
-      msg = 'directly calling a coorb_waveform_basis surrogate will return a waveform in the co-orbital frame.\n'
-      msg += 'Please use EvaluateSurrogate to evaluate co-orbital frame surrogates.\n'
-      msg += 'Use EvaluateSurrogate call method to evaluate in the inertial frame.\n'
-      msg += 'Use EvaluateSurrogate.evaluate_single_mode to evaluate in the co-orbital frame.\n' 
-      raise ValueError(msg)
-
-
     # For models with NR calibration information, we need to find the calibration values
     # at a given value of parameter space. These calibration parameters will scale the 
     # time and amplitude. Currently, these models use calibration:
@@ -211,12 +483,7 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
 
 
     ### if (M,distance) provided, a physical mode in mks units is returned ###
-    if( M is not None and dist is not None):
-      amp0    = ((M * _gwtools.MSUN_SI ) / (1.e6*dist*_gwtools.PC_SI )) * ( _gwtools.G / np.power(_gwtools.c,2.0) )
-      t_scale = _gwtools.Msuninsec * M
-    else:
-      amp0    = 1.0
-      t_scale = 1.0
+    amp0, t_scale = self._physical_scalings(M, dist)
 
     # any model-specific amplitude scalings should go here
     if(self.surrogateID == 'EMRISur1dq1e4'):
@@ -251,19 +518,22 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
 
     # convert from input to internal surrogate parameter values, and check within training region #
     x = self.get_surr_params_safe(q)
-    
-    ### Evaluate dimensionless single mode surrogates ###
-    hp, hc = self._h_sur(x, times=times)
+
+    return x, t, times, amp0
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _finish_evaluation(self, t, hp, hc, amp0, phi_ref=None, f_low=None, out_hp=None, out_hc=None):
+    """apply the phase adjustment, amplitude scaling, f_low check and sign
+       convention of __call__ to the dimensionless hp, hc evaluated at t.
+       The scaled hp, hc are written into out_hp, out_hc if given."""
 
     ### adjust mode's phase by an overall constant ###
     if (phi_ref is not None):
-      h  = self.adjust_merger_phase(hp + 1.0j*hc,phi_ref)
-      hp = h.real
-      hc = h.imag
+      self._rotate_inplace(hp, hc, phi_ref - self._phase_at_peak(hp, hc))
 
     ### Restore amplitude scaling ###
-    hp     = amp0 * hp
-    hc     = amp0 * hc
+    hp     = np.multiply(amp0, hp, out=out_hp)
+    hc     = np.multiply(amp0, hc, out=out_hc)
 
     ### check that surrogate's starting frequency is below f_low, otherwise throw a warning ###
     if f_low is not None:
@@ -271,10 +541,23 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
 
     # different models were built using different conventions of hlm and hp \pm i hx
     if self.surrogateID == 'EMRISur1dq1e4':
-      return t, hp, -hc
+      return t, hp, np.negative(hc, out=hc)
     else:
   	  return t, hp, hc
 
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _physical_scalings(self, M, dist):
+    """amplitude and time scalings (amp0, t_scale) from the dimensionless surrogate
+       to a physical one in mks units. Both are 1 unless M and dist are given."""
+
+    if( M is not None and dist is not None):
+      amp0    = ((M * _gwtools.MSUN_SI ) / (1.e6*dist*_gwtools.PC_SI )) * ( _gwtools.G / np.power(_gwtools.c,2.0) )
+      t_scale = _gwtools.Msuninsec * M
+    else:
+      amp0    = 1.0
+      t_scale = 1.0
+    return amp0, t_scale
+
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
   def compute_BHPT_calibration_params(self, q):
     """
@@ -332,19 +615,44 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
   def phi_merger(self,h):
-    """Phase of mode at amplitude's discrete peak. h = A*exp(i*phi)."""
+    """Phase of mode at amplitude's discrete peak. h = A*exp(i*phi).
+
+       The phase is unwrapped from the first sample, as by amp_phase, but
+       only up to the peak, which is located from |h|^2 without a sqrt."""
+
+    h = np.ravel(h)
+    argmax_amp = np.argmax(h.real*h.real + h.imag*h.imag)
+
+    return np.unwrap(np.angle(h[:argmax_amp+1]))[-1]
+
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _phase_at_peak(self, hp, hc):
+    """Phase, in (-pi, pi], of h = hp + 1j*hc at its amplitude's discrete peak.
+
+       Equals phi_merger up to a multiple of 2 pi without computing (and
+       unwrapping) the amplitude and phase at every sample."""
 
-    amp, phase = self.amp_phase(h)
-    argmax_amp = np.argmax(amp)
+    k = np.argmax(hp*hp + hc*hc)
+    return np.arctan2(hc[k], hp[k])
 
-    return phase[argmax_amp]
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _rotate_inplace(self, hp, hc, angle):
+    """hp + 1j*hc -> exp(1j*angle)*(hp + 1j*hc), overwriting hp and hc
+       with a real 2x2 rotation rather than forming the complex waveform."""
 
+    c, s = np.cos(angle), np.sin(angle)
+    s_hp = s*hp
+    hp *= c
+    hp -= s*hc
+    hc *= c
+    hc += s_hp
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
   def adjust_merger_phase(self,h,phiref):
     """Modify GW mode's phase such that at time of amplitude peak, t_peak, we have phase(t_peak) = phiref"""
 
-    phimerger = self.phi_merger(h)
+    phimerger = self._phase_at_peak(h.real, h.imag)
     phiadj    = phiref - phimerger
 
     return _gwtools.modify_phase(h,phiadj)
@@ -360,8 +668,10 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
     import time
     tic = time.time()
     if M_eval is None:
-      for i in ran:
-        hp, hc = self._h_sur(i)
+      # batches of 100 waveforms, each computed by one matrix-matrix product.
+      # A single batch of 1000 would need 16 kB per time sample
+      for batch in np.array_split(ran, 10):
+        hp, hc = self._h_sur_batch(batch)
     else:
       for i in ran:
         t, hp, hc = self.__call__(i,M_eval,dist_eval,phi_ref,f_low,times)
@@ -414,13 +724,22 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
 
     if self.surrogate_mode_type  == 'waveform_basis':
 
+      # copies, so that callers can not modify the (cached) bases
       if flavor == 'cardinal':
-        basis = self.B[:,i]
+        if self._B is None:
+          basis = self.B_re[:,i] + 1j*self.B_im[:,i]
+        else:
+          basis = self._B[:,i].copy()
       elif flavor == 'orthogonal':
-        basis = np.dot(self.B,self.V)[:,i]
+        if self._BV is None:
+          self._BV = np.dot(self.B,self.V)
+        basis = self._BV[:,i].copy()
       elif flavor == 'waveform':
-        E = np.dot(self.B,self.V)
-        basis = np.dot(E,self.R)[:,i]
+        if self._BVR is None:
+          if self._BV is None:
+            self._BV = np.dot(self.B,self.V)
+          self._BVR = np.dot(self._BV,self.R)
+        basis = self._BVR[:,i].copy()
       else:
         raise ValueError("Not a valid basis type")
 
@@ -429,54 +748,141 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
 
     return basis
 
-  # TODO: basis resampling should be unified.
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
   # TODO: ext should be passed from __call__
   def resample_B(self, times, ext=1):
-    """resample the empirical interpolant operator, B, at the input time samples"""
+    """resample the empirical interpolant operator, B, at the input time samples
+
+       ext has the same meaning as in scipy's splev, but only ext=0
+       (extrapolate) and ext=1 (zero outside the surrogate's temporal
+       interval) are supported."""
+
+    # write the parts into the complex result, without complex temporaries
+    re_B, im_B = self._resample_B_reim(times, ext)
+    B = np.empty(re_B.shape, dtype=complex)
+    B.real = re_B
+    B.imag = im_B
+    return B
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _resample_B_reim(self, times, ext=1):
+    """same as resample_B, but returns the real and imaginary parts separately"""
 
-    evaluations = np.array([_splev(times, self.reB_spline_params[jj],ext=ext)  \
-             + 1j*_splev(times, self.imB_spline_params[jj],ext=ext) for jj in range(self.B.shape[1])]).T
+    values = self._resample_spline(self._B_spline, times, ext)
+    dim_rb = self.B_re.shape[1]
+    return values[:,:dim_rb], values[:,dim_rb:]
 
-    # allow for extrapolation if very close to surrogate's temporal interval
-    t0 = self.times[0]
-    if (np.abs(times[0] - t0) < t0 * 1.e-12) or (t0==0 and np.abs(times[0] - t0) <1.e-12):
-      evaluations[0] = np.array([_splev(times[0], self.reB_spline_params[jj],)  \
-             + 1j*_splev(times[0], self.imB_spline_params[jj]) for jj in range(self.B.shape[1])]).T
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _resample_spline(self, spline, times, ext=1):
+    """evaluate all columns of a basis spline at times in one call, as a
+       product with the (cached) design matrix of times, so the times are
+       located among the knots once for all columns and calls.
+       For ext=1 the values outside the temporal interval are zero."""
+
+    times = np.asarray(times)
+    values = self._spline_values(spline, times, spline.c)
+    outside = self._outside_interval(times, ext)
+    if outside is not None:
+      values[outside] = 0.
+    return values
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _outside_interval(self, times, ext=1):
+    """mask of the times at which the resampled basis is zero, None for ext=0"""
+
+    if ext not in [0, 1]:
+      raise ValueError('ext must be 0 or 1')
+    if ext == 0:
+      return None
+
+    t_lo, t_hi = self._t_interval
+    return (times < t_lo) | (times > t_hi)
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _design_matrix(self, times, spline):
+    """sparse matrix D such that D.dot(spline.c) == spline(times).
+
+       Every basis spline shares the knots of the surrogate's time grid, so
+       D only depends on times. Parameter estimation evaluates the surrogate
+       at the same times over and over, so D is cached for the last
+       _design_cache_size distinct times arrays. None if scipy is too old to
+       provide BSpline.design_matrix."""
+
+    if not hasattr(_BSpline, 'design_matrix'):
+      return None
+
+    for ii, (cached_times, D) in enumerate(self._design_cache):
+      if cached_times.shape == times.shape and np.array_equal(cached_times, times):
+        if ii > 0:
+          self._design_cache.insert(0, self._design_cache.pop(ii))
+        return D
+
+    D = _BSpline.design_matrix(times, spline.t, spline.k, extrapolate=True)
+    self._design_cache.insert(0, (times.copy(), D))
+    del self._design_cache[self._design_cache_size:]
+    return D
+
+  _design_cache_size = 4
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _spline_values(self, spline, times, c):
+    """values at times of the spline with spline's knots and coefficients c"""
+
+    D = self._design_matrix(times, spline)
+    if D is None:
+      return _BSpline.construct_fast(spline.t, c, spline.k)(times)
+    values = D.dot(c.reshape(c.shape[0], -1))
+    return values.reshape(times.shape + c.shape[1:])
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _spline_dot(self, spline, times, coeffs):
+    """np.dot(spline(times), coeffs) for a vector-valued spline of the basis.
+
+       Splines are linear in their coefficients, so the coefficient table is
+       contracted with coeffs first and a single spline evaluated at times.
+       The resampled basis, (len(times), dim_rb), is never formed."""
 
-    return evaluations
+    return self._spline_values(spline, times, np.dot(spline.c, coeffs))
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _resample_B_dot(self, times, h_EIM, ext=1):
+    """same as self._B_dot(*self._resample_B_reim(times, ext), h_EIM), computed
+       by a spline of the waveform itself (see _spline_dot)."""
+
+    times = np.asarray(times)
+    dim_rb = self.B_re.shape[1]
+    c = self._B_spline.c
+    c_hp, c_hc = self._B_dot(c[:,:dim_rb], c[:,dim_rb:], h_EIM)
+    values = self._spline_values(self._B_spline, times, np.stack((c_hp, c_hc), axis=1))
+    hp, hc = values[:,0], values[:,1]
+
+    outside = self._outside_interval(times, ext)
+    if outside is not None:
+      hp[outside] = 0.
+      hc[outside] = 0.
+    return hp, hc
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
   # TODO: ext should be passed from __call__
   def resample_B_1(self, times, ext=1):
     """resample the B_1 basis at the input time samples"""
 
-    evaluations = np.array([_splev(times, self.B1_spline_params[jj],ext=1) for jj in range(self.B_1.shape[1])]).T
-
-    # allow for extrapolation if very close to surrogate's temporal interval
-    if np.abs(times[0] - self.times[0])/self.times[0] < 1.e-12:
-      evaluations[0] = np.array([_splev(times[0], self.B1_spline_params[jj],ext=1) for jj in range(self.B_1.shape[1])]).T
-
-    return evaluations
+    return self._resample_spline(self._B1_spline, times, ext)
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
   # TODO: ext should be passed from __call__
   def resample_B_2(self, times, ext=1):
     """resample the B_2 basis at the input samples"""
 
-    evaluations = np.array([_splev(times, self.B2_spline_params[jj],ext=1) for jj in range(self.B_2.shape[1])]).T
-
-    # allow for extrapolation if very close to surrogate's temporal interval
-    if np.abs(times[0] - self.times[0])/self.times[0] < 1.e-12:
-      evaluations[0] = np.array([_splev(times[0], self.B2_spline_params[jj],ext=1) for jj in range(self.B_2.shape[1])]).T
-
-    return evaluations
+    return self._resample_spline(self._B2_spline, times, ext)
 
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
   def plot_rb(self, i, showQ=True):
     """plot the ith reduced basis waveform"""
 
+    import matplotlib.pyplot as plt
+
     # Compute surrogate approximation of RB waveform
     basis = self.basis(i)
     fig   = _plot_pretty(self.times,[basis.real,basis.imag])
@@ -493,6 +899,8 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
                 label=['$h_+(t)$', '$h_-(t)$'], legendQ=False, showQ=True):
     """plot surrogate evaluated at mass ratio q_eval"""
 
+    import matplotlib.pyplot as plt
+
     t, hp, hc = self.__call__(q_eval)
     h = hp + 1j*hc
 
@@ -527,6 +935,8 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
   def plot_eim_data(self, inode=None, htype='Amp', nuQ=False, fignum=1, showQ=True):
     """Plot empirical interpolation data used for performing fits in parameter"""
 
+    import matplotlib.pyplot as plt
+
     fig = plt.figure(fignum)
     ax1 = fig.add_subplot(111)
 
@@ -564,6 +974,8 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
   def plot_eim_fits(self, inode=None, htype='Amp', nuQ=False, fignum=1, num=200, showQ=True):
     """Plot empirical interpolation data and fits"""
 
+    import matplotlib.pyplot as plt
+
     fig = plt.figure(fignum)
     ax1 = fig.add_subplot(111)
 
@@ -608,9 +1020,15 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
   def check_training_interval(self, x, strong_checking=True):
     """Check if parameter value x is within the training interval."""
 
-    x_min, x_max = self.fit_interval
+    x_min, x_max = self._x_min, self._x_max
+
+    # plain comparisons for the usual scalar x, avoiding numpy's dispatch
+    if np.isscalar(x) or getattr(x, 'shape', None) == ():
+      outside = x < x_min or x > x_max
+    else:
+      outside = np.any(x < x_min) or np.any(x > x_max)
 
-    if(np.any(x < x_min) or np.any(x > x_max)):
+    if outside:
       if strong_checking:
         raise ValueError('Surrogate not trained at requested parameter value')
       else:
@@ -635,7 +1053,10 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
 
         x is assumed to NOT have total mass M as a parameter. ``Bare" surrogates are always dimensionless."""
 
-    x_internal = self.get_surr_params(x)
+    if self._identity_params:
+      x_internal = x
+    else:
+      x_internal = self.get_surr_params(x)
 
     # TODO: this will (redundantly) check for each mode. Multimode surrogate should directly check it
     self.check_training_interval(x_internal)
@@ -673,17 +1094,7 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
   def _affine_mapper(self, x):
     """map parameter value x to the standard interval [-1,1] if necessary."""
 
-    x_min, x_max = self.fit_interval
-
-    if self.affine_map == 'minus1_to_1':
-      x_0 = 2.*(x - x_min)/(x_max - x_min) - 1.;
-    elif self.affine_map == 'zero_to_1':
-      x_0 = (x - x_min)/(x_max - x_min);
-    elif self.affine_map == 'none':
-      x_0 = x
-    else:
-      raise ValueError('unknown affine map')
-    return x_0
+    return self._affine_slope*x + self._affine_offset
 
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
@@ -694,10 +1105,22 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
 
     if not self.norms:
       return 1.
+    elif self._fitparams_norm_T is not None:
+      return np.array([ _polyval(x_0, self._fitparams_norm_T) ])
     else:
       return np.array([ self.norm_fit_func(self.fitparams_norm, x_0) ])
 
 
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _polyval_coeffs(self, fit_type, fitparams, dtype=np.float64):
+    """Coefficients of polyval_1d fits in numpy.polynomial order, with the
+       degree along the first axis, stored as dtype. None for any other fit type."""
+
+    if fit_type != 'polyval_1d':
+      return None
+    fitparams = np.asarray(fitparams, dtype=dtype)
+    return np.ascontiguousarray(fitparams[...,::-1].T)
+
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
   def _amp_eval(self, x_0):
     """Evaluate set of amplitude fits at x_0, where x_0 is the mapped parameter value.
@@ -706,6 +1129,10 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
 
     if self.fit_type_amp == 'fast_spline_real':
       return self.amp_fit_func(self.fitparams_amp, x_0)
+    elif self._fitparams_amp_T is not None:
+      return _polyval(x_0, self._fitparams_amp_T, tensor=False)
+    elif self.amp_fit_func_batch is not None:
+      return self.amp_fit_func_batch(self.fitparams_amp, x_0)
     else:
       return np.array([ self.amp_fit_func(self.fitparams_amp[jj,:], x_0) for jj in range(self.fitparams_amp.shape[0]) ])
 
@@ -718,6 +1145,10 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
 
     if self.fit_type_phase == 'fast_spline_imag':
       return self.phase_fit_func(self.fitparams_phase, x_0)
+    elif self._fitparams_phase_T is not None:
+      return _polyval(x_0, self._fitparams_phase_T, tensor=False)
+    elif self.phase_fit_func_batch is not None:
+      return self.phase_fit_func_batch(self.fitparams_phase, x_0)
     else:
       return np.array([ self.phase_fit_func(self.fitparams_phase[jj,:], x_0) for jj in range(self.fitparams_phase.shape[0]) ])
 
@@ -729,6 +1160,8 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
 
     if self.fit_type_amp == 'fast_spline_real':
       return self.amp_fit_func(self.fitparams_re, x_0)
+    elif self.amp_fit_func_batch is not None:
+      return self.amp_fit_func_batch(self.fitparams_re, x_0)
     else:
       return np.array([ self.re_fit_func(self.fitparams_re[jj,:], x_0) for jj in range(self.fitparams_re.shape[0]) ])
   
@@ -739,6 +1172,8 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
 
     if self.fit_type_amp == 'fast_spline_real':
       return self.amp_fit_func(self.fitparams_im, x_0)
+    elif self.phase_fit_func_batch is not None:
+      return self.phase_fit_func_batch(self.fitparams_im, x_0)
     else:
       return np.array([ self.im_fit_func(self.fitparams_im[jj,:], x_0) for jj in range(self.fitparams_im.shape[0]) ])
 
@@ -759,6 +1194,10 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
     ### x to the standard interval on which the fits were performed ###
     x_0 = self._affine_mapper(x)
 
+    if surrogate_mode_type == 'waveform_basis':
+      h_EIM = self._eim_coeffs_reim(x_0)
+      return h_EIM[:,0] + 1j*h_EIM[:,1]
+
     ### Evaluate amp/phase/norm fits ###
     if self.surrogate_mode_type  == 'coorb_waveform_basis':
       re_eval = self._coorb_re_eval(x_0)
@@ -768,13 +1207,7 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
       phase_eval = self._phase_eval(x_0)
     nrm_eval   = self._norm_eval(x_0)
 
-    if self.surrogate_mode_type  == 'waveform_basis':
-      if self.fit_type_amp == 'fast_spline_real':
-        h_EIM = nrm_eval * (amp_eval + 1j*phase_eval)
-      else:
-        h_EIM = nrm_eval*amp_eval*np.exp(1j*phase_eval) # dim_RB-vector fit evaluation of h
-      return h_EIM
-    elif self.surrogate_mode_type  == 'amp_phase_basis':
+    if self.surrogate_mode_type  == 'amp_phase_basis':
       if self.fit_type_amp == 'fast_spline_real':
         raise ValueError("invalid combination")
       return amp_eval, phase_eval, nrm_eval
@@ -786,69 +1219,231 @@ class EvaluateSingleModeSurrogate(_H5Surrogate, _TextSurrogateRead):
       raise ValueError('invalid surrogate type')
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-  def _h_sur(self, x, times=None):
-    """Evaluate surrogate at parameter value x. x could be mass ratio, symmetric
-       mass ratio or something else -- it depends on the surrogate's parameterization.
+  def _eim_coeffs_reim(self, x_0):
+    """Evaluate the EIM coefficients of a waveform_basis surrogate at the mapped
+       parameter value x_0. Returns a real (dim_rb, 2) array holding the real
+       and imaginary parts of nrm*amp*exp(1j*phase), see _B_dot.
 
-       Returns dimensionless rh/M waveforms in units of t/M.
+       WARNING: this function should NEVER be called from outside the class."""
 
-       This should ONLY be called by the __call__ method which accounts for
-       different parameterization choices. """
+    if self._use_jit_eim:
+      return _h_eim_polyval(self._poly_fitparams_amp, self._poly_fitparams_phase,
+                            self._poly_fitparams_norm, self.norms, float(x_0))
 
+    amp_eval   = self._amp_eval(x_0)
+    phase_eval = self._phase_eval(x_0)
+    nrm_eval   = self._norm_eval(x_0)
 
-    if self.surrogate_mode_type  == 'waveform_basis':
+    # amp_eval and phase_eval are freshly evaluated, so are safe to overwrite.
+    # h_EIM is allocated per call: the surrogate may be evaluated by several
+    # threads at once (see EvaluateSurrogate's mode_threads)
+    h_EIM = np.empty((amp_eval.shape[0], 2))
+    if self.fit_type_amp == 'fast_spline_real':
+      np.multiply(nrm_eval, amp_eval, out=h_EIM[:,0])
+      np.multiply(nrm_eval, phase_eval, out=h_EIM[:,1])
+    else:
+      np.multiply(nrm_eval, amp_eval, out=amp_eval)
+      _amp_cis(amp_eval, phase_eval, h_EIM)
+    return h_EIM
 
-      h_EIM = self._eim_coeffs(x, 'waveform_basis')
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _eim_coeffs_reim_batch(self, x):
+    """EIM coefficients of a waveform_basis surrogate at each (internal)
+       parameter value in the 1d array x, as a real (dim_rb, len(x), 2) array
+       (see _eim_coeffs_reim). None if the fits can not be evaluated in a batch.
 
-      if times is None:
-        surrogate = np.dot(self.B, h_EIM)
-      else:
-        surrogate = np.dot(self.resample_B(times), h_EIM)
+       WARNING: this function should NEVER be called from outside the class."""
 
-      #surrogate = nrm_eval * surrogate
+    if self.surrogate_mode_type != 'waveform_basis' \
+        or self.amp_fit_func_batch is None \
+        or self.phase_fit_func_batch is None:
+      return None
 
-    elif self.surrogate_mode_type  == 'amp_phase_basis':
+    x_0 = self._affine_mapper(x)
+    amp_eval   = self._amp_eval(x_0[:,np.newaxis])
+    phase_eval = self._phase_eval(x_0[:,np.newaxis])
+    if self.norms:
+      amp_eval = self.norm_fit_func(self.fitparams_norm, x_0)[:,np.newaxis]*amp_eval
 
-      amp_eval, phase_eval, nrm_eval = self._eim_coeffs(x, 'amp_phase_basis')
+    h_EIM = np.empty(amp_eval.shape[::-1] + (2,)) # (dim_rb, N, 2)
+    return _amp_cis(amp_eval.T, phase_eval.T, h_EIM)
 
-      if times is None:
-        sur_A = np.dot(self.B_1, amp_eval)
-        sur_P = np.dot(self.B_2, phase_eval)
-      else:
-        #sur_A = np.dot(np.array([_splev(times, self.B1_spline_params[jj],ext=1) for jj in range(self.B_1.shape[1])]).T, amp_eval)
-        #sur_P = np.dot(np.array([_splev(times, self.B2_spline_params[jj],ext=1) for jj in range(self.B_2.shape[1])]).T, phase_eval)
-        sur_A = np.dot(self.resample_B_1(times), amp_eval)
-        sur_P = np.dot(self.resample_B_2(times), phase_eval)
-    
-      surrogate = nrm_eval * sur_A * np.exp(1j*sur_P)
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _h_sur_batch(self, x, times=None):
+    """Evaluate surrogate at each parameter value in the array x.
 
-    elif self.surrogate_mode_type  == 'coorb_waveform_basis':
+       Returns dimensionless rh/M waveforms hp, hc of shape (len(times), len(x)).
+       For waveform_basis surrogates with batched fits all waveforms are computed
+       by a single matrix-matrix product with B, otherwise _h_sur is called in a loop.
+
+       As with _h_sur, x is the surrogate's internal parameter value."""
 
-      re_eval, im_eval, nrm_eval = self._eim_coeffs(x, 'coorb_waveform_basis')
+    x = np.atleast_1d(np.asarray(x, dtype=np.float64))
 
+    h_EIM = self._eim_coeffs_reim_batch(x)
+    if h_EIM is not None:
       if times is None:
-        sur_Re = np.dot(self.B_1, re_eval)
-        sur_Im = np.dot(self.B_2, im_eval)
+        return self._B_dot(self.B_re, self.B_im, h_EIM)
       else:
-        sur_Re = np.dot(self.resample_B_1(times), re_eval)
-        sur_Im = np.dot(self.resample_B_2(times), im_eval)
-   
-      surrogate = nrm_eval * (sur_Re + 1j*sur_Im)
-    
+        return self._resample_B_dot(times, h_EIM)
 
+    hs = [self._h_sur(x_i, times=times) for x_i in x]
+    hp = np.stack([h[0] for h in hs], axis=-1)
+    hc = np.stack([h[1] for h in hs], axis=-1)
+    return hp, hc
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _h_sur(self, x, times=None):
+    """Evaluate surrogate at parameter value x. x could be mass ratio, symmetric
+       mass ratio or something else -- it depends on the surrogate's parameterization.
+
+       Returns dimensionless rh/M waveforms in units of t/M.
+
+       This should ONLY be called by the __call__ method which accounts for
+       different parameterization choices.
+
+       __init__ replaces this by the instance's _h_sur_<surrogate_mode_type>
+       method, which does the evaluation without dispatching on the type."""
+
+    if self.surrogate_mode_type  == 'waveform_basis':
+      return self._h_sur_waveform_basis(x, times)
+    elif self.surrogate_mode_type  == 'amp_phase_basis':
+      return self._h_sur_amp_phase_basis(x, times)
+    elif self.surrogate_mode_type  == 'coorb_waveform_basis':
+      return self._h_sur_coorb_waveform_basis(x, times)
     else:
       raise ValueError('invalid surrogate type')
 
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _h_sur_waveform_basis(self, x, times=None):
+    """_h_sur of a waveform_basis surrogate"""
+
+    if times is None and self._use_jit_fast_spline:
+      x_0 = self._affine_mapper(x)
+      hp = np.empty(self.B_re.shape[0])
+      hc = np.empty(self.B_re.shape[0])
+      _h_sur_fast_spline(self.B_re, self.B_im,
+        np.ascontiguousarray(self._amp_eval(x_0), dtype=np.float64),
+        np.ascontiguousarray(self._phase_eval(x_0), dtype=np.float64),
+        np.asarray(self._norm_eval(x_0)).item(), hp, hc)
+      return hp, hc
+
+    # real arithmetic throughout, no complex h_EIM or surrogate is formed
+    h_EIM = self._eim_coeffs_reim(self._affine_mapper(x))
+
+    if times is None:
+      return self._B_dot(self.B_re, self.B_im, h_EIM)
+    else:
+      return self._resample_B_dot(times, h_EIM)
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _h_sur_amp_phase_basis(self, x, times=None):
+    """_h_sur of an amp_phase_basis surrogate"""
+
+    amp_eval, phase_eval, nrm_eval = self._eim_coeffs(x, 'amp_phase_basis')
+
+    if times is None:
+      sur_A = np.dot(self.B_1, amp_eval)
+      sur_P = np.dot(self.B_2, phase_eval)
+    else:
+      times = np.asarray(times)
+      outside = self._outside_interval(times)
+      sur_A = self._spline_dot(self._B1_spline, times, amp_eval)
+      sur_P = self._spline_dot(self._B2_spline, times, phase_eval)
+      sur_A[outside] = 0.
+      sur_P[outside] = 0.
+
+    # nrm*A*exp(1j*P) in real arithmetic, no complex temporaries are formed
+    np.multiply(nrm_eval, sur_A, out=sur_A)
+    hp = sur_A*np.cos(sur_P)
+    hc = np.multiply(sur_A, np.sin(sur_P, out=sur_P), out=sur_A)
+
+    return hp, hc
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _h_sur_coorb_waveform_basis(self, x, times=None):
+    """_h_sur of a coorb_waveform_basis surrogate"""
+
+    re_eval, im_eval, nrm_eval = self._eim_coeffs(x, 'coorb_waveform_basis')
 
-    hp = surrogate.real
-    #hp = hp.reshape([self.time_samples,])
-    hc = surrogate.imag
-    #hc = hc.reshape([self.time_samples,])
+    if times is None:
+      sur_Re = np.dot(self.B_1, re_eval)
+      sur_Im = np.dot(self.B_2, im_eval)
+    else:
+      times = np.asarray(times)
+      outside = self._outside_interval(times)
+      sur_Re = self._spline_dot(self._B1_spline, times, re_eval)
+      sur_Im = self._spline_dot(self._B2_spline, times, im_eval)
+      sur_Re[outside] = 0.
+      sur_Im[outside] = 0.
+
+    hp = np.multiply(nrm_eval, sur_Re, out=sur_Re)
+    hc = np.multiply(nrm_eval, sur_Im, out=sur_Im)
 
     return hp, hc
 
 
-def CreateManyEvaluateSingleModeSurrogates(path, deg, ell_m, excluded, enforce_orbital_plane_symmetry):
+##############################################
+class _LazyModeDict(dict):
+  """dict of (ell, m) mode to EvaluateSingleModeSurrogate whose values are
+     only constructed on first access.
+
+     Keys are known from the start; a mode added with set_loader is built by
+     calling its loader the first time it is looked up. on_load(mode,
+     surrogate), if set, is called on each newly built mode before it is stored.
+
+     keys(), len, membership tests and iterating over the dict never load a
+     mode. [] and get load the mode looked up. values() and items() are views
+     that load each mode only as the iteration reaches it. Pickling keeps
+     modes not yet loaded unloaded (loaders must be picklable)."""
+
+  def __init__(self):
+    dict.__init__(self)
+    self._loaders = {}
+    self._lock    = _threading.Lock()
+    self.on_load  = None
+
+  def set_loader(self, mode, loader):
+    dict.__setitem__(self, mode, None)
+    self._loaders[mode] = loader
+
+  def is_loaded(self, mode):
+    return mode not in self._loaders
+
+  def __getitem__(self, mode):
+    if mode in self._loaders:
+      with self._lock:
+        if mode in self._loaders:
+          surrogate = self._loaders[mode]()
+          if self.on_load is not None:
+            self.on_load(mode, surrogate)
+          dict.__setitem__(self, mode, surrogate)
+          del self._loaders[mode]
+    return dict.__getitem__(self, mode)
+
+  def get(self, mode, default=None):
+    return self[mode] if mode in self else default
+
+  def values(self):
+    return collections.abc.ValuesView(self)
+
+  def items(self):
+    return collections.abc.ItemsView(self)
+
+  def __reduce__(self):
+    # dict.items, not items, so that pickling does not load every mode
+    state = self.__dict__.copy()
+    del state['_lock']
+    return (self.__class__, (), state, None, iter(dict.items(self)))
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    self._lock = _threading.Lock()
+
+
+def CreateManyEvaluateSingleModeSurrogates(path, deg, ell_m, excluded, enforce_orbital_plane_symmetry,
+                                           basis_dtype=np.float64, basis_mmap=False, eager=True,
+                                           fit_dtype=np.float64, text_cache=None):
   """For each surrogate mode an EvaluateSingleModeSurrogate class
      is created.
 
@@ -865,6 +1460,12 @@ def CreateManyEvaluateSingleModeSurrogates(path, deg, ell_m, excluded, enforce_o
         surrogate data contains negative modes. This can be used to gaurd against
         mixing spin-aligned and precessing surrogates...which have different
         evaluation patterns for m<0.
+     basis_dtype: passed to each EvaluateSingleModeSurrogate.
+     basis_mmap: passed to each EvaluateSingleModeSurrogate.
+     fit_dtype: passed to each EvaluateSingleModeSurrogate.
+     text_cache: passed to each EvaluateSingleModeSurrogate.
+     eager: if False, each mode's surrogate is only constructed the first time
+        it is looked up in single_mode_dict (a _LazyModeDict).
 
      Returns single_mode_dict. Keys are (ell, m) mode and value is an
      instance of EvaluateSingleModeSurrogate."""
@@ -874,7 +1475,9 @@ def CreateManyEvaluateSingleModeSurrogates(path, deg, ell_m, excluded, enforce_o
     excluded = []
 
   ### fill up dictionary with single mode surrogate class ###
-  single_mode_dict = dict()
+  single_mode_dict = dict() if eager else _LazyModeDict()
+  mode_kwargs = dict(basis_dtype=basis_dtype, basis_mmap=basis_mmap, fit_dtype=fit_dtype,
+                     text_cache=text_cache)
 
   # Load HDF5 or Text surrogate data depending on input file extension
   if type(path) == h5py._hl.files.File:
@@ -888,7 +1491,7 @@ def CreateManyEvaluateSingleModeSurrogates(path, deg, ell_m, excluded, enforce_o
   if ext == 'hdf5' or ext == 'h5':
 
     if filemode not in ['r+', 'w']:
-      fp = h5py.File(path, filemode)
+      fp = _open_h5(path, filemode)
 
       ### compile list of excluded modes ###
       if type(excluded) == list:
@@ -935,33 +1538,51 @@ def CreateManyEvaluateSingleModeSurrogates(path, deg, ell_m, excluded, enforce_o
       for mode_key in mode_keys:
         assert(mode_keys.count(mode_key)==1)
         mode_key_str = 'l'+str(mode_key[0])+'_m'+str(mode_key[1])
-        print("loading surrogate mode... " + mode_key_str)
-        single_mode_dict[mode_key] = \
-          EvaluateSingleModeSurrogate(fp,subdir=mode_key_str+'/',closeQ=False)
+        if eager:
+          print("loading surrogate mode... " + mode_key_str)
+          single_mode_dict[mode_key] = \
+            EvaluateSingleModeSurrogate(fp,subdir=mode_key_str+'/',closeQ=False,**mode_kwargs)
+        else:
+          single_mode_dict.set_loader(mode_key, _h5_mode_loader(fp.filename, filemode, mode_key_str,
+                                                                mode_kwargs))
       fp.close()
 
   else:
     ### compile list of available modes ###
-    # assumes (i) single mode folder format l#_m#_
-    #         (ii) ell<=9, m>=0
     import os
-    for single_mode in _list_folders(path,'l'):
-      ell = int(single_mode[1])
-      emm = int(single_mode[4])
-      mode_key = (ell,emm)
+    mode_folders = []
+    for mode_key, single_mode in _list_mode_folders(path):
+      ell, emm = mode_key
       if (ell_m is None) or (mode_key in ell_m):
         if ((type(excluded) == list and not mode_key in excluded) or
             (excluded == 'DEFAULT' and not
              os.path.isfile(path+single_mode+'/EXCLUDED.txt'))):
-          assert(mode_key not in single_mode_dict)
+          assert(mode_key not in [mk for mk, _ in mode_folders])
           if os.path.isfile(path+single_mode+'/EXCLUDED.txt'):
             print("Warning: Including mode (%d,%d) which is excluded by default"%(ell, emm))
           if enforce_orbital_plane_symmetry and emm < 0:
             raise Exception("When using enforce_orbital_plane_symmetry, do not load negative m modes!")
 
-          print("loading surrogate mode... "+single_mode[0:5])
-          single_mode_dict[mode_key] = \
-            EvaluateSingleModeSurrogate(path+single_mode+'/')
+          if eager:
+            print("loading surrogate mode... l%d_m%d"%(ell, emm))
+          mode_folders.append((mode_key, single_mode))
+
+    ### load the single mode surrogates, concurrently as they are independent ###
+    load_mode = lambda single_mode: \
+      EvaluateSingleModeSurrogate(path+single_mode+'/',**mode_kwargs)
+    if not eager:
+      for mode_key, single_mode in mode_folders:
+        single_mode_dict.set_loader(mode_key, _text_mode_loader(path, mode_key, single_mode,
+                                                                mode_kwargs))
+      return single_mode_dict
+    folders = [single_mode for _, single_mode in mode_folders]
+    if _ThreadPoolExecutor is not None and len(folders) > 1:
+      with _ThreadPoolExecutor() as ex:
+        mode_surrogates = list(ex.map(load_mode, folders))
+    else:
+      mode_surrogates = [load_mode(single_mode) for single_mode in folders]
+    for (mode_key, _), mode_surrogate in zip(mode_folders, mode_surrogates):
+      single_mode_dict[mode_key] = mode_surrogate
     ### check all requested modes have been loaded ###
     if ell_m is not None:
       for tmp in ell_m:
@@ -973,12 +1594,50 @@ def CreateManyEvaluateSingleModeSurrogates(path, deg, ell_m, excluded, enforce_o
   return single_mode_dict
 
 
+# helper function
+def _h5_mode_loader(filename, filemode, mode_key_str, mode_kwargs):
+  '''loader for a _LazyModeDict, reopens the HDF5 file to build the mode'''
+
+  return functools.partial(_load_h5_mode, filename, filemode, mode_key_str, mode_kwargs)
+
+def _load_h5_mode(filename, filemode, mode_key_str, mode_kwargs):
+  print("loading surrogate mode... " + mode_key_str)
+  fp = _open_h5(filename, filemode)
+  try:
+    return EvaluateSingleModeSurrogate(fp,subdir=mode_key_str+'/',closeQ=False,**mode_kwargs)
+  finally:
+    fp.close()
+
+# helper function
+def _text_mode_loader(path, mode_key, single_mode, mode_kwargs):
+  '''loader for a _LazyModeDict, builds the mode from its text folder'''
+
+  return functools.partial(_load_text_mode, path, mode_key, single_mode, mode_kwargs)
+
+def _load_text_mode(path, mode_key, single_mode, mode_kwargs):
+  print("loading surrogate mode... l%d_m%d"%mode_key)
+  return EvaluateSingleModeSurrogate(path+single_mode+'/',**mode_kwargs)
+
+# helper function
+@functools.lru_cache(maxsize=None)
+def _modes_up_to(LMax, minus_m):
+  '''tuple of all (ell,m) modes with 2 <= ell <= LMax and m >= 0, followed by
+     the m < 0 modes if minus_m'''
+
+  modes = [(L,emm) for L in range(2,LMax+1) for emm in range(0,L+1)]
+  if minus_m:
+    modes += [(L,-emm) for L in range(2,LMax+1) for emm in range(1,L+1)]
+  return tuple(modes)
+
+
 ##############################################
 class EvaluateSurrogate():
   """Evaluate multi-mode surrogates"""
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-  def __init__(self, path, deg=3, ell_m=None, excluded='DEFAULT', use_orbital_plane_symmetry=True):
+  def __init__(self, path, deg=3, ell_m=None, excluded='DEFAULT', use_orbital_plane_symmetry=True,
+               basis_dtype=np.float64, basis_mmap=False, eager=True, fit_dtype=np.float64,
+               mode_threads=None, verbose=False, text_cache=None):
     """Loads a surrogate.
 
     path: the path to the surrogate
@@ -993,7 +1652,37 @@ class EvaluateSurrogate():
     use_orbital_plane_symmetry: If set to true (i) CreateManyEvaluateSingleModeSurrogates
         will explicitly check that m<0 do not exist in the data file and (ii) m<0 modes
         are inferred from m>0 modes. If set to false no symmetry is assumed -- typical
-        of precessing models. When False, fake_neg_modes must be false."""
+        of precessing models. When False, fake_neg_modes must be false.
+    basis_dtype: float type of the (real and imaginary) waveform basis used on
+        the surrogate's time grid. The default, np.float64, reproduces the
+        surrogate to double precision. np.float32 halves the memory traffic of
+        the waveform-basis product but limits the relative accuracy of each mode
+        to ~1e-7 (24 vs 53 bit mantissa), which is usually well below a
+        surrogate's modeling error. Only waveform_basis modes are affected.
+    basis_mmap: if True, each mode's waveform basis is saved to a .npy file next
+        to the surrogate data (once) and memory mapped read-only, so that many
+        processes loading the same surrogate share a single copy of it. The
+        bases of different modes are then not stacked for the mode sum.
+    eager: if False, only the first mode is loaded here and every other mode
+        the first time it is evaluated, which saves start-up time and memory
+        when few modes are used. Each mode is checked for consistency as it
+        is loaded, and the bases are not stacked for the mode sum.
+    fit_dtype: float type of the stored coefficients of polyval_1d amplitude,
+        phase and norm fits, which are evaluated in double precision. np.float32
+        halves the size of the fit tables, but rounds each coefficient to ~1e-7
+        relative accuracy, and the compiled evaluation paths are not used.
+        The phase, which reaches hundreds of radians, is the most sensitive
+        to this; check the errors against the surrogate's before using it.
+    mode_threads: if larger than 1, modes that are evaluated one by one (i.e.
+        not summed with the stacked bases) are evaluated concurrently by this
+        many threads. NumPy releases the GIL in the evaluation, but a
+        multithreaded BLAS may already use the available cores.
+    verbose: if True, print the surrogate's interval, time grid and
+        parameterization once loaded.
+    text_cache: text surrogates only. None (default) parses the text data files
+        on every load. Otherwise, a directory (created if needed) in which
+        binary .npy copies of them are kept, which later loads read instead.
+        Bases are memory mapped from their copies."""
 
     # obtain the surrogate ID name from the datafile
     # it is important for some of the if statements written later on
@@ -1009,39 +1698,44 @@ class EvaluateSurrogate():
       assert (ell_m is None or (2,2) in ell_m), msg
  
     self.single_mode_dict = \
-      CreateManyEvaluateSingleModeSurrogates(path, deg, ell_m, excluded, use_orbital_plane_symmetry)
+      CreateManyEvaluateSingleModeSurrogates(path, deg, ell_m, excluded, use_orbital_plane_symmetry,
+                                             basis_dtype=basis_dtype, basis_mmap=basis_mmap, eager=eager,
+                                             fit_dtype=fit_dtype, text_cache=text_cache)
 
     self.use_orbital_plane_symmetry = use_orbital_plane_symmetry
 
+    # modes modeled by the surrogate, in the single mode dict's order and as
+    # a set for fast membership tests
+    self._mode_keys     = tuple(self.single_mode_dict)
+    self._modeled_modes = frozenset(self._mode_keys)
+
+    # threads evaluating the modes of __call__ (see _evaluate_modes_concurrently)
+    self._mode_threads = mode_threads
+    self._mode_pool    = self._make_mode_pool(mode_threads)
+
     ### Load/deduce multi-mode surrogate properties ###
     #if filemode not in ['r+', 'w']:
     if len(self.single_mode_dict) == 0:
       raise IOError('Modes not found. Mode subdirectories begins with l#_m#_')
 
 
-    first_mode_surr = self.single_mode_dict[list(self.single_mode_dict.keys())[0]]
+    first_mode_surr = self.single_mode_dict[self._mode_keys[0]]
+    self._first_mode_surr = first_mode_surr
 
-    ### Check single mode temporal grids are collocated -- define common grid ###
-    grid_shape = first_mode_surr.time().shape
-    for key in list(self.single_mode_dict.keys()):
-      tmp_shape = self.single_mode_dict[key].time().shape
-      if(grid_shape != tmp_shape):
-        raise ValueError('inconsistent single mode temporal grids')
+    ### Check single mode temporal grids and parameterizations agree ###
+    # lazily loaded modes are checked as they are loaded
+    if eager:
+      for key in self._mode_keys:
+        self._check_mode_consistency(key, self.single_mode_dict[key])
+    else:
+      self.single_mode_dict.on_load = self._check_mode_consistency
 
     # common time grid for all modes
     self.time_grid = first_mode_surr.time
+    self._num_grid_samples = first_mode_surr.times.shape[0]
 
-    ### Check single mode surrogates have the same parameterization ###
-    # TODO: if modes use different parameterization -- better to let modes handle this?
     training_parameter_range = first_mode_surr.fit_interval
     parameterization = first_mode_surr.get_surr_params
-    for key in list(self.single_mode_dict.keys()):
-      tmp_range = self.single_mode_dict[key].fit_interval
-      tmp_parameterization = self.single_mode_dict[key].get_surr_params
-      if(np.max(np.abs(tmp_range - training_parameter_range)) != 0):
-        raise ValueError('inconsistent single mode parameter grids')
-      if(tmp_parameterization != parameterization):
-        raise ValueError('inconsistent single mode parameterizations')
     # common parameter interval and parameterization for all modes
     # use newer parameter space class for common interface
     pd = ParamDim(name='unknown parameter',
@@ -1050,15 +1744,206 @@ class EvaluateSurrogate():
     self.param_space = ParamSpace(name='unknown', params=[pd])
     self.parameterization = parameterization
 
-    print("Surrogate interval",training_parameter_range)
-    print("Surrogate time grid",self.time_grid())
-    print("Surrogate parameterization"+self.parameterization.__doc__)
+    self._setup_fused_basis()
+    self._ylm_table_cache = None
+    self._ylm_theta_cache = collections.OrderedDict()
+
+    if verbose:
+      print("Surrogate interval",training_parameter_range)
+      print("Surrogate time grid",self.time_grid())
+      print("Surrogate parameterization"+self.parameterization.__doc__)
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _make_mode_pool(self, mode_threads):
+    """thread pool of mode_threads workers, or None if modes are not to be
+       evaluated concurrently"""
+
+    if mode_threads is not None and mode_threads > 1 and _ThreadPoolExecutor is not None:
+      return _ThreadPoolExecutor(max_workers=mode_threads)
+    return None
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def __getstate__(self):
+    # a thread pool cannot be pickled, the copy starts its own
+    state = self.__dict__.copy()
+    state['_mode_pool'] = None
+    return state
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    self._mode_pool = self._make_mode_pool(self._mode_threads)
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _check_mode_consistency(self, mode, single_mode):
+    """raise a ValueError if the single mode surrogate's temporal grid or
+       parameterization differs from that of the first mode"""
+
+    # compared as shapes and (2-element) tuples, without array temporaries
+    first_mode_surr = self._first_mode_surr
+    if first_mode_surr.times.shape != single_mode.times.shape:
+      raise ValueError('inconsistent single mode temporal grids')
+    # TODO: if modes use different parameterization -- better to let modes handle this?
+    if tuple(single_mode.fit_interval) != tuple(first_mode_surr.fit_interval):
+      raise ValueError('inconsistent single mode parameter grids')
+    if(single_mode.get_surr_params != first_mode_surr.get_surr_params):
+      raise ValueError('inconsistent single mode parameterizations')
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _setup_fused_basis(self):
+    """stack the real and imaginary waveform bases of all modes into a single
+       (2, times, sum of dim_rb) block, so that a sum over modes is computed
+       by one matrix product (see _fused_mode_sum). Each mode's B_re, B_im
+       become views into this block, so no basis data is duplicated.
+
+       Only done if every mode is a plain waveform_basis surrogate whose basis
+       is not memory mapped, as stacking would copy it into private memory,
+       and the modes are not lazily loaded."""
+
+    self._B_all_reim = None
+    self._B_all_cols = {}
+
+    if isinstance(self.single_mode_dict, _LazyModeDict):
+      return
+
+    modes = sorted(self._mode_keys)
+    for mode in modes:
+      sm = self.single_mode_dict[mode]
+      if sm.surrogate_mode_type != 'waveform_basis' or \
+         sm.surrogateID in ['EMRISur1dq1e4', 'BHPTNRSur1dq1e4'] or \
+         sm._B_reim_cache is not None:
+        return
+
+    B_all_reim = np.concatenate([self.single_mode_dict[mode]._B_reim for mode in modes], axis=2)
+    start = 0
+    for mode in modes:
+      sm   = self.single_mode_dict[mode]
+      stop = start + sm._B_reim.shape[2]
+      sm._B_reim = B_all_reim[:,:,start:stop]
+      sm.B_re    = sm._B_reim[0]
+      sm.B_im    = sm._B_reim[1]
+      self._B_all_cols[mode] = (start, stop)
+      start = stop
+    self._B_all_reim = B_all_reim
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def get_ylm_table(self, theta, phi, modes):
+    """spin-weighted (s=-2) spherical harmonics at (theta, phi) for each
+       (ell,m) in modes, returned as a complex array in the order of modes.
+
+       The most recent table is cached, so repeated evaluations at a fixed
+       location on the sphere do not recompute the harmonics. The returned
+       array is read-only.
+
+       Each harmonic is a real function of theta times exp(1j*m*phi). The
+       theta factors, which are costly to evaluate, are cached for the last
+       _ylm_cache_size (theta, modes), so that varying phi only (e.g. in
+       match_surrogate) does not recompute them either."""
+
+    key = (float(theta), float(phi), tuple(modes))
+    if self._ylm_table_cache is not None and self._ylm_table_cache[0] == key:
+      return self._ylm_table_cache[1]
+
+    theta_key = key[0::2]
+    theta_cache = self._ylm_theta_cache
+    if theta_key in theta_cache:
+      lam = theta_cache.pop(theta_key) # re-inserted as the most recent below
+    else:
+      lam = [_sYlm(-2,ll=ell,mm=m,theta=theta,phi=0.0).real for ell, m in modes]
+      if len(theta_cache) >= self._ylm_cache_size:
+        theta_cache.popitem(last=False)
+    theta_cache[theta_key] = lam
+
+    # combined with exp(1j*m*phi) exactly as sYlm does
+    table = np.array([complex(l*np.cos(m*phi), l*np.sin(m*phi)) for l, (ell, m) in zip(lam, modes)],
+                     dtype=complex)
+    table.flags.writeable = False
+    self._ylm_table_cache = (key, table)
+    return table
+
+  _ylm_cache_size = 64
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _drop_small_sylm_modes(self, modes_to_evaluate, theta, phi, sylm_tol):
+    """modes of modes_to_evaluate whose |sYlm(theta,phi)| is at least
+       sylm_tol times the largest one. BHPTNRSur1dq1e4 always keeps the (2,2)
+       mode, which sets the orbital phase of its other modes."""
+
+    abs_ylm = np.abs(self.get_ylm_table(theta, phi, modes_to_evaluate))
+    cutoff  = sylm_tol*abs_ylm.max()
+    keep_22 = self.surrogateID=='BHPTNRSur1dq1e4'
+    return [mode for mode, a in zip(modes_to_evaluate, abs_ylm)
+            if a >= cutoff or (keep_22 and mode==(2,2))]
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _can_fuse_mode_sum(self, modes_to_evaluate, theta, phi, times, f_low, fake_neg_modes):
+    """whether the sum over modes_to_evaluate can be done by _fused_mode_sum.
+       The stacked bases are only known on the surrogate's time grid and
+       f_low is checked mode by mode, so times and f_low use the mode loop."""
+
+    if self._B_all_reim is None or theta is None or phi is None \
+       or times is not None or f_low is not None:
+      return False
+    for ell, m in modes_to_evaluate:
+      if (ell,m) not in self._B_all_cols and \
+         not (fake_neg_modes and m < 0 and (ell,-m) in self._B_all_cols):
+        return False
+    return True
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _fused_mode_sum(self, q, M, dist, theta, phi, z_rot, units, modes_to_evaluate,
+                      out_hp=None, out_hc=None, dtype=np.float64):
+    """Sum of modes_to_evaluate on the sphere computed with one product against
+       the stacked bases. Same output as the mode-by-mode loop in __call__.
+
+       Each mode (ell,m) is c_{ell,m} z_{ell,m} with z = np.dot(B, h_EIM) and
+       c = sYlm*exp(1j*m*z_rot); faked m<0 modes contribute (-1)^ell c conj(z_{ell,-m}).
+       Collecting A (B) as the coefficients multiplying z (conj(z)) of each
+       modeled mode gives h = sum_modes (A+B) Re z + 1j*(A-B) Im z, which is
+       linear in B_re and B_im. hp and hc, of type dtype, are written into
+       out_hp and out_hc if given."""
+
+    # the input is handled as by each mode's __call__
+    first = self.single_mode_dict[min(self._B_all_cols)]
+    x, t, times, amp0 = first._setup_evaluation(q, M, dist, None, units)
+
+    ### coefficients of z and conj(z) for each modeled mode ###
+    ylm = self.get_ylm_table(theta, phi, modes_to_evaluate)
+    coef_z, coef_zconj = {}, {}
+    for (ell, m), coef in zip(modes_to_evaluate, ylm):
+      if z_rot is not None:
+        coef = coef*np.exp(1.0j*z_rot*m)
+      if (ell,m) in self._B_all_cols:
+        coef_z[(ell,m)] = coef_z.get((ell,m), 0.) + coef
+      else:
+        coef_zconj[(ell,-m)] = coef_zconj.get((ell,-m), 0.) + (1 - 2*(ell & 1))*coef
+
+    B_all_re, B_all_im = self._B_all_reim[0], self._B_all_reim[1]
+    X = np.zeros((B_all_re.shape[1], 2))
+    Y = np.zeros((B_all_re.shape[1], 2))
+    for mode in set(coef_z) | set(coef_zconj):
+      a = coef_z.get(mode, 0.) + coef_zconj.get(mode, 0.)
+      b = 1.0j*(coef_z.get(mode, 0.) - coef_zconj.get(mode, 0.))
+      sm = self.single_mode_dict[mode]
+      h_EIM = sm._eim_coeffs_reim(sm._affine_mapper(x))
+      hr, hi = h_EIM[:,0], h_EIM[:,1]
+      cols = slice(*self._B_all_cols[mode])
+      X[cols,0] = a.real*hr + b.real*hi
+      X[cols,1] = a.imag*hr + b.imag*hi
+      Y[cols,0] = b.real*hr - a.real*hi
+      Y[cols,1] = b.imag*hr - a.imag*hi
+
+    h = np.dot(B_all_re, X.astype(B_all_re.dtype, copy=False)) \
+      + np.dot(B_all_im, Y.astype(B_all_im.dtype, copy=False))
+    return first._finish_evaluation(t, h[:,0].astype(dtype), h[:,1].astype(dtype), amp0,
+                                    out_hp=out_hp, out_hc=out_hc)
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
   def __call__(self, q, M=None, dist=None, theta=None,phi=None,
                      z_rot=None, f_low=None, times=None,
                      units='dimensionless',
-                     ell=None, m=None, mode_sum=True,fake_neg_modes=True):
+                     ell=None, m=None, mode_sum=True,fake_neg_modes=True,
+                     out_hp=None, out_hc=None, dtype=np.float64, sylm_tol=0.0):
     """Return surrogate evaluation for...
 
       INPUT
@@ -1077,6 +1962,13 @@ class EvaluateSurrogate():
       m              --- for each ell, supply a matching m value
       mode_sum       --- if true, all modes are summed, if false all modes are returned in an array
       fake_neg_modes --- if true, include m<0 modes deduced from m>0 mode. all m in [ell,m] input should be non-negative
+      out_hp/out_hc  --- optional C-contiguous arrays of type dtype the result is written into (and returned), e.g. to
+                         reuse memory over repeated calls. Their shape must be (samples,) if mode_sum,
+                         otherwise (samples, number of modes)
+      dtype          --- floating point type of hp and hc. With np.float32 the modes are cast to single
+                         precision once evaluated, and rotated/summed in single precision
+      sylm_tol       --- if mode_sum and theta/phi are given, modes with |sYlm| < sylm_tol*max|sYlm| are
+                         not evaluated. The default, 0, evaluates every mode
 
       NOTE: if only requesting one mode, this should be ell=[2],m=[2]
 
@@ -1100,6 +1992,25 @@ class EvaluateSurrogate():
     if self.surrogateID=="BHPTNRSur1dq1e4" and mode_sum:
       assert (2,2) in modes_to_evaluate, "Must include 22 in mode_sum for the BHPTNRSur1dq1e4 model"
 
+    ### output type and caller supplied output arrays ###
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+      raise ValueError('dtype must be np.float32 or np.float64')
+    complex_dtype = np.result_type(dtype, np.complex64)
+    if (out_hp is None) != (out_hc is None):
+      raise ValueError('out_hp and out_hc must be given together')
+    if out_hp is not None:
+      out_shape = (self._num_samples(times),)
+      if not mode_sum:
+        out_shape += (len(modes_to_evaluate),)
+      if out_hp.shape != out_shape or out_hc.shape != out_shape:
+        raise ValueError('out_hp and out_hc must have shape '+str(out_shape))
+      if out_hp.dtype != dtype or out_hc.dtype != dtype:
+        raise ValueError('out_hp and out_hc must be of type '+str(dtype))
+      for out in (out_hp, out_hc):
+        if not (out.flags.c_contiguous and out.flags.writeable):
+          raise ValueError('out_hp and out_hc must be C-contiguous and writeable')
+
     if mode_sum and (theta is None and phi is None) and len(modes_to_evaluate)!=1:
       raise ValueError('Trying to sum modes without theta and phi is a strange idea')
 
@@ -1125,15 +2036,43 @@ class EvaluateSurrogate():
       if self.surrogateID!='BHPTNRSur1dq1e4':
         modes_to_evaluate = self.sort_mode_list(modes_to_evaluate)
     
+    ### drop modes that (nearly) vanish at this point on the sphere ###
+    if mode_sum and sylm_tol > 0 and theta is not None and phi is not None:
+      modes_to_evaluate = self._drop_small_sylm_modes(modes_to_evaluate, theta, phi, sylm_tol)
+
+    ### all modes summed by a single product with the stacked bases ###
+    if mode_sum and self._can_fuse_mode_sum(modes_to_evaluate, theta, phi, times, f_low, fake_neg_modes):
+      return self._fused_mode_sum(q, M, dist, theta, phi, z_rot, units, modes_to_evaluate,
+                                  out_hp, out_hc, dtype)
+
     # Modes actually modeled by the surrogate. We will fake negative m
     # modes later if needed.
-    modeled_modes = self.all_model_modes(False)
+    modeled_modes = self._modeled_modes
 
     ### allocate arrays for multimode polarizations ###
+    # a sum over modes is accumulated in a single complex h = hp + 1j*hc, which
+    # starts as the first mode. Without numba the modes are instead stacked as
+    # rows of H_reim and summed by BLAS matrix-vector products after the loop.
+    # Otherwise every column is written by its mode
     if mode_sum:
-      hp_full, hc_full = self._allocate_output_array(times,1,mode_sum)
+      h_full = None
+      H_reim = None
+      coefs  = np.empty(len(modes_to_evaluate), dtype=complex_dtype)
+    elif out_hp is not None:
+      hp_full, hc_full = out_hp, out_hc
     else:
-      hp_full, hc_full = self._allocate_output_array(times,len(modes_to_evaluate),mode_sum)
+      hp_full, hc_full = self._allocate_output_array(times,len(modes_to_evaluate),mode_sum,
+                                                     zero_init=False, dtype=dtype)
+
+    ### harmonics of all evaluation modes, looked up from a shared table ###
+    if theta is not None and phi is not None:
+      ylm = self.get_ylm_table(theta, phi, modes_to_evaluate)
+    else:
+      ylm = [None]*len(modes_to_evaluate)
+
+    ### evaluations of all modes, if done concurrently ###
+    evaluated = self._evaluate_modes_concurrently(q,M,dist,f_low,times,units,
+                                                  modes_to_evaluate,fake_neg_modes)
 
     ### loop over all evaluation modes ###
     # TODO: internal workings are simplified if h used instead of (hc,hp)
@@ -1145,9 +2084,18 @@ class EvaluateSurrogate():
       neg_modeled = (ell,-m) in modeled_modes
       if is_modeled or (neg_modeled and fake_neg_modes):
 
+        # a faked mode h(l,-m) = (-1)^l h(l,m)^* is served as the (l,m) mode, whose
+        # sign and conjugation are folded into the coefficient below. Except for
+        # BHPTNRSur1dq1e4, whose coorbital frame transformation needs the mode itself
+        by_symmetry = not is_modeled and self.surrogateID!='BHPTNRSur1dq1e4'
+
         # if model is BHPTNRSur1dq1e4 and mode not 22, hp/hc are in the coorbital frame
-        if is_modeled:
+        if evaluated is not None:
+          t_mode, hp_mode, hc_mode = evaluated[ii]
+        elif is_modeled:
           t_mode, hp_mode, hc_mode = self.evaluate_single_mode(q,M,dist,f_low,times,units,ell,m)
+        elif by_symmetry:
+          t_mode, hp_mode, hc_mode = self.evaluate_single_mode(q,M,dist,f_low,times,units,ell,-m)
         else: # then we must have neg_modeled=True and fake_neg_modes=True
           t_mode, hp_mode, hc_mode = self.evaluate_single_mode_by_symmetry(q,M,dist,f_low,times,units,ell,m)
 
@@ -1161,43 +2109,110 @@ class EvaluateSurrogate():
           else:
                hp_mode, hc_mode = self.coorbital_to_inertial(hp_mode, hc_mode, m, orbital_phase)
 
-        if z_rot is not None:
-          h_tmp   = _gwtools.modify_phase(hp_mode+1.0j*hc_mode,z_rot*m)
-          hp_mode = h_tmp.real
-          hc_mode = h_tmp.imag
+        if dtype != np.float64:
+          hp_mode = hp_mode.astype(dtype, copy=False)
+          hc_mode = hc_mode.astype(dtype, copy=False)
 
-        # TODO: should be faster. integrate this later on
-        #if fake_neg_modes and m != 0:
-        #  hp_mode_mm, hc_mode_mm = self._generate_minus_m_mode(hp_mode,hc_mode,ell,m)
-        #  hp_mode_mm, hc_mode_mm = self.evaluate_on_sphere(ell,-m,theta,phi,hp_mode_mm,hc_mode_mm)
+        # the z_rot rotation and evaluation on the sphere (see evaluate_on_sphere)
+        # multiply the mode by a single complex factor
+        coef = 1.0
+        if z_rot is not None:
+          coef = np.exp(1.0j*z_rot*m)
+        if theta is not None:
+          if phi is None: raise ValueError('phi must have a value')
+          coef = coef*ylm[ii]
+        if dtype != np.float64:
+          coef = complex_dtype.type(coef)
+
+        # the mode is coef*(hp_mode + 1j*hc_sign*hc_mode)
+        hc_sign = 1.0
+        if by_symmetry:
+          coef    = (1 - 2*(ell & 1))*coef
+          hc_sign = -1.0
 
-        hp_mode, hc_mode = self.evaluate_on_sphere(ell,m,theta,phi,hp_mode,hc_mode)
-        
         if mode_sum:
-          hp_full = hp_full + hp_mode
-          hc_full = hc_full + hc_mode
-          #if fake_neg_modes and m != 0:
-          #  hp_full = hp_full + hp_mode_mm
-          #  hc_full = hc_full + hc_mode_mm
+          if not _numba_enabled:
+            if H_reim is None:
+              H_reim = np.empty((2, len(modes_to_evaluate), hp_mode.shape[0]), dtype=dtype)
+            H_reim[0,ii] = hp_mode
+            np.multiply(hc_mode, hc_sign, out=H_reim[1,ii])
+            coefs[ii]    = coef
+          elif h_full is None:
+            h_full  = hp_mode + (1.0j*hc_sign)*hc_mode
+            h_full *= coef
+          else: # one compiled pass, no complex temporaries
+            _accumulate_mode(hp_mode, hc_mode, complex(coef), h_full, hc_sign)
         else:
-          if len(modes_to_evaluate)==1:
-            hp_full[:] = hp_mode[:]
-            hc_full[:] = hc_mode[:]
-          else:
-            hp_full[:,ii] = hp_mode[:]
-            hc_full[:,ii] = hc_mode[:]
+          # real rotation and scaling by coef, written into the output
+          # columns without forming the complex mode
+          c_re, c_im = coef.real, coef.imag
+          np.multiply(hp_mode, c_re, out=hp_full[:,ii])
+          np.multiply(hc_mode, c_re*hc_sign, out=hc_full[:,ii])
+          if z_rot is not None or theta is not None:
+            hp_full[:,ii] -= (c_im*hc_sign)*hc_mode
+            hc_full[:,ii] += c_im*hp_mode
       else:
         warning_str = "Your mode (ell,m) = ("+str(ell)+","+str(m)+") is not available!"
         raise Warning(warning_str)
 
       ii+=1
         
-    if mode_sum:
-      return t_mode, hp_full, hc_full #assumes all mode's have same temporal grid
+    if mode_sum: #assumes all mode's have same temporal grid
+      if H_reim is not None:
+        c_re, c_im = coefs.real, coefs.imag
+        hp_sum  = np.dot(c_re, H_reim[0], out=out_hp)
+        hp_sum -= np.dot(c_im, H_reim[1])
+        hc_sum  = np.dot(c_re, H_reim[1], out=out_hc)
+        hc_sum += np.dot(c_im, H_reim[0])
+        return t_mode, hp_sum, hc_sum
+      if out_hp is None:
+        return t_mode, h_full.real.copy(), h_full.imag.copy()
+      np.copyto(out_hp, h_full.real)
+      np.copyto(out_hc, h_full.imag)
+      return t_mode, out_hp, out_hc
     else: # helpful to have (l,m) list for understanding mode evaluations
+      if len(modes_to_evaluate)==1: # return as vector instead of array
+        hp_full, hc_full = hp_full[:,0], hc_full[:,0]
       return modes_to_evaluate, t_mode, hp_full, hc_full
 
             
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _evaluate_modes_concurrently(self, q, M, dist, f_low, times, units, modes, fake_neg_modes):
+    """evaluate each of modes with the thread pool (see mode_threads), as the
+       mode loop of __call__ would: faked m<0 modes are returned as their m>0
+       mode. Returns a list of (t, hp, hc) ordered as modes, or None if the
+       modes are to be evaluated in the loop itself.
+
+       Each modeled mode is evaluated by a single job, whose result also
+       serves its faked m<0 mode."""
+
+    if self._mode_pool is None or len(modes) < 2:
+      return None
+
+    modeled = []
+    for ell, m in modes:
+      if (ell,m) in self._modeled_modes:
+        modeled.append((ell,m))
+      elif fake_neg_modes and (ell,-m) in self._modeled_modes:
+        modeled.append((ell,-m))
+      else: # the mode loop reports unavailable modes
+        return None
+
+    jobs = {}
+    for mode in modeled:
+      if mode not in jobs:
+        jobs[mode] = self._mode_pool.submit(self.evaluate_single_mode, q, M, dist, f_low,
+                                            times, units, mode[0], mode[1])
+
+    evaluated = []
+    for (ell, m), mode in zip(modes, modeled):
+      t_mode, hp_mode, hc_mode = jobs[mode].result()
+      # BHPTNRSur1dq1e4 needs the m<0 mode itself (see __call__)
+      if mode != (ell,m) and self.surrogateID=='BHPTNRSur1dq1e4':
+        hp_mode, hc_mode = self._generate_minus_m_mode(hp_mode, hc_mode, ell, -m)
+      evaluated.append((t_mode, hp_mode, hc_mode))
+    return evaluated
+
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
   def coorbital_to_inertial(self, coorb_re, coorb_im, m, orbital_phase):
     """ Takes the real and imaginary part of the waveform and
@@ -1225,13 +2240,15 @@ class EvaluateSurrogate():
     return list_of_modes
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-  def evaluate_on_sphere(self,ell,m,theta,phi,hp_mode,hc_mode):
-    """evaluate on the sphere"""
+  def evaluate_on_sphere(self,ell,m,theta,phi,hp_mode,hc_mode,sYlm_value=None):
+    """evaluate on the sphere. A precomputed harmonic (e.g. from
+       get_ylm_table) may be passed as sYlm_value."""
 
     if theta is not None:
       #if phi is None: phi = 0.0
       if phi is None: raise ValueError('phi must have a value')
-      sYlm_value =  _sYlm(-2,ll=ell,mm=m,theta=theta,phi=phi)
+      if sYlm_value is None:
+        sYlm_value =  _sYlm(-2,ll=ell,mm=m,theta=theta,phi=phi)
       h = sYlm_value*(hp_mode + 1.0j*hc_mode)
       hp_mode = h.real
       hc_mode = h.imag
@@ -1256,7 +2273,7 @@ class EvaluateSurrogate():
 
     if m<0:
       t_mode, hp_mode, hc_mode = self.evaluate_single_mode(q, M, dist, f_low, times, units,ell,-m)
-      hp_mode, hc_mode         = self._generate_minus_m_mode(hp_mode,hc_mode,ell,-m)
+      hp_mode, hc_mode         = self._generate_minus_m_mode(hp_mode,hc_mode,ell,-m,inplace=True)
     else:
       raise ValueError('m must be negative.')
 
@@ -1279,17 +2296,10 @@ class EvaluateSurrogate():
     ### generate list of nonnegative m modes to evaluate for ###
     if ell is None and m is None:
       modes_to_eval = self.all_model_modes()
-    elif m is None:
-      LMax = ell
-      modes_to_eval = []
-      for L in range(2,LMax+1):
-        for emm in range(0,L+1):
-          modes_to_eval.append((L,emm))
-    else: # neither pythonic nor fast
-      #modes_to_eval = [(x, y) for x in ell for y in m]
-      modes_to_eval = []
-      for ii in range(len(ell)):
-        modes_to_eval.append((ell[ii],m[ii]))
+    elif m is None: # m<0 modes come with the cached list
+      return list(_modes_up_to(ell, minus_m))
+    else:
+      modes_to_eval = list(zip(ell, m))
 
     ### if m<0 requested, build these from m>=0 list ###
     if minus_m:
@@ -1301,10 +2311,8 @@ class EvaluateSurrogate():
   def sort_mode_list(self,mode_list):
     """sort modes as (2,-2), (2,-1), ..., (2,2), (3,-3),(3,-2)..."""
 
-    from operator import itemgetter
-
-    mode_list = sorted(mode_list, key=itemgetter(0,1))
-    return mode_list
+    # (ell,m) tuples already compare lexicographically
+    return sorted(mode_list)
 
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
@@ -1312,7 +2320,7 @@ class EvaluateSurrogate():
     """ from single mode keys deduce all available model modes.
         If minus_m=True, include (ell,-m) whenever (ell,m) is available ."""
 
-    model_modes = [(ell,m) for ell,m in self.single_mode_dict.keys()] # Py2 list, Py3 iterator
+    model_modes = list(self._mode_keys) # a new list, callers may modify it
 
     if minus_m:
       model_modes = self._extend_mode_list_minus_m(model_modes)
@@ -1334,7 +2342,22 @@ class EvaluateSurrogate():
     """ match discrete complex polarization (t_ref,h_ref) to surrogate waveform for
         given input values. Inputs have same meaning as those passed to __call__
 
-        Minimization (i.e. match) over time shifts and z-axis rotations"""
+        Minimization (i.e. match) over time shifts and z-axis rotations.
+
+        speed: 'slow' evaluates the surrogate for every trial shift and rotation,
+        'fast' evaluates spline interpolants of the modes and 'fft' shifts the
+        modes' spectra (see _fft_parameterized_waveform).
+
+        speed='fft' limitations:
+          1) the common time grid of the surrogate and (t_ref,h_ref) must lie at
+             least 8 of its samples (2*n_taper of _fft_parameterized_waveform)
+             inside the surrogate's times, otherwise a ValueError is raised. If
+             t_ref is not well inside the surrogate's times, increase t_low_adj
+             and t_up_adj to at least 8 samples of t_ref's spacing.
+          2) the shifted waveform is a band limited interpolation of the modes.
+             It agrees with direct surrogate evaluation to about 1e-5 of the
+             peak amplitude (4e-6 for the tutorial surrogate), not to machine
+             precision, so the minimum can differ slightly from speed='slow'."""
 
     # TODO: routine only works for hp,hc evaluated on the sphere. should extend to modes
 
@@ -1346,7 +2369,7 @@ class EvaluateSurrogate():
 
       ### setup minimization problem -- deduce common time grid and approximate minimization solution from discrete waveform ###
       time_sur,hp,hc = self.__call__(q=q,M=M,dist=dist,theta=theta,phi=0.0,\
-                                  times=self.time_all_modes(), units='dimensionless',ell=ell,m=m,fake_neg_modes=fake_neg_modes)
+                                  times=self.time_grid(), units='dimensionless',ell=ell,m=m,fake_neg_modes=fake_neg_modes)
       h_sur =  hp + 1.0j*hc
 
       # TODO: this deltaPhi is overall phase shift -- NOT a good guess for minimizations
@@ -1354,12 +2377,16 @@ class EvaluateSurrogate():
          _gwtools.setup_minimization_from_discrete_waveforms(time_sur,h_sur,t_ref,h_ref,t_low_adj,t_up_adj)
 
       ### (tc,phic)-parameterized waveform function to induce a parameterized norm ###
+      # every evaluation is written into the same output arrays
+      out_hp = np.empty(common_times.shape[0])
+      out_hc = np.empty(common_times.shape[0])
       def parameterized_waveform(x):
         tc   = x[0]
         phic = x[1]
         times = _gwtools.coordinate_time_shift(common_times,tc)
         times,hp,hc = self.__call__(q=q,M=M,dist=dist,theta=theta,phi=phic,\
-                                  times=times, units=t_ref_units,ell=ell,m=m,fake_neg_modes=fake_neg_modes)
+                                  times=times, units=t_ref_units,ell=ell,m=m,fake_neg_modes=fake_neg_modes,
+                                  out_hp=out_hp,out_hc=out_hc)
         return hp + 1.0j*hc
 
     elif speed == 'fast': # build spline interpolant of modes, evaluate the interpolant
@@ -1374,6 +2401,16 @@ class EvaluateSurrogate():
           _gwtools.setup_minimization_from_discrete_waveforms(t_mode,h1,t_ref,h_ref,t_low_adj,t_up_adj)
       parameterized_waveform = _gwtools.generate_parameterize_waveform(common_times,h_sphere,'h_sphere',theta)
 
+    elif speed == 'fft': # evaluate modes once, shift and rotate their spectra
+
+      time_sur,hp,hc = self.__call__(q=q,M=M,dist=dist,theta=theta,phi=0.0,\
+                                  ell=ell,m=m,fake_neg_modes=fake_neg_modes)
+
+      junk1, h2_eval, common_times, deltaT, deltaPhi = \
+          _gwtools.setup_minimization_from_discrete_waveforms(time_sur,hp+1.0j*hc,t_ref,h_ref,t_low_adj,t_up_adj)
+      parameterized_waveform = self._fft_parameterized_waveform(q,M,dist,theta,t_ref_units,ell,m,
+                                                                 fake_neg_modes,time_sur,common_times)
+
     else:
       raise ValueError('not coded yet')
 
@@ -1386,6 +2423,70 @@ class EvaluateSurrogate():
 
     return min_norm, opt_solution, [common_times, hsur_align, h2_eval]
 
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _fft_parameterized_waveform(self, q, M, dist, theta, units, ell, m, fake_neg_modes,
+                                  time_sur, common_times, oversample=4, n_taper=4):
+    """function of x = (tc, phic) returning the waveform at theta, rotated by
+       phic about the z-axis, at times common_times + tc.
+
+       The modes are evaluated once, on a uniform grid over the surrogate's
+       times time_sur that contains common_times and is oversample times finer
+       than time_sur (whose own interpolation is only piecewise smooth), and
+       modes of equal m are summed. Their first and last n_taper
+       samples of common_times' spacing are tapered, and common_times must lie
+       at least 2*n_taper such samples within time_sur. Each evaluation
+       multiplies the zero padded spectra by exp(1j*m*phic) and the time
+       shift's phase ramp, followed by one inverse FFT whose samples at
+       common_times are returned. This is band limited interpolation, so tc
+       should be small compared to the margin."""
+
+    # grid spacing dt/over, so that common_times are every over-th sample
+    dt      = common_times[1] - common_times[0]
+    over    = max(1, int(np.ceil(oversample*dt/np.min(np.diff(time_sur)) - 1.e-8)))
+    dt_grid = dt/over
+    j_lo    = int(np.ceil((time_sur[0] - common_times[0])/dt_grid)) + 1
+    j_hi    = int(np.floor((time_sur[-1] - common_times[0])/dt_grid)) - 1
+    j_last  = (common_times.shape[0] - 1)*over
+    n_taper = n_taper*over
+    if j_lo + 2*n_taper > 0 or j_hi - 2*n_taper < j_last:
+      raise ValueError('common time grid must lie at least %d of its samples '
+                       'within the surrogate\'s times'%(2*n_taper//over))
+    grid = common_times[0] + dt_grid*np.arange(j_lo, j_hi+1)
+
+    modes, t, hp_full, hc_full = self.__call__(q=q,M=M,dist=dist,times=grid,units=units,
+                                  ell=ell,m=m,mode_sum=False,fake_neg_modes=fake_neg_modes)
+    if len(modes)==1:
+      hp_full, hc_full = hp_full[:,None], hc_full[:,None]
+
+    ### sum modes of equal m on the sphere ###
+    ylm = self.get_ylm_table(theta, 0.0, modes)
+    h_m = {}
+    for ii, (ell_ii, m_ii) in enumerate(modes):
+      h_m[m_ii] = h_m.get(m_ii, 0.) + ylm[ii]*(hp_full[:,ii] + 1.0j*hc_full[:,ii])
+    m_values = np.array(sorted(h_m))
+    h_m = np.array([h_m[m_ii] for m_ii in m_values])
+
+    # the truncated ends ring when shifted, so they are smoothly tapered
+    taper = 0.5*(1.0 - np.cos(np.pi*(np.arange(n_taper) + 0.5)/n_taper))
+    h_m[:,:n_taper]  *= taper
+    h_m[:,-n_taper:] *= taper[::-1]
+
+    # at least twice the grid's length, so shifts do not wrap around
+    n_fft   = _next_fast_len(2*grid.shape[0])
+    spectra = np.fft.fft(h_m, n=n_fft, axis=1)
+    ramp    = 2.0j*np.pi*np.fft.fftfreq(n_fft, dt_grid)
+    start   = -j_lo
+    stop    = start + j_last + 1
+
+    def parameterized_waveform(x):
+      tc   = x[0]
+      phic = x[1]
+      h_f  = np.dot(np.exp(1.0j*m_values*phic), spectra)
+      h_f *= np.exp(ramp*tc)
+      return np.fft.ifft(h_f)[start:stop:over]
+
+    return parameterized_waveform
+
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
   def h_sphere_builder(self, q, M=None,dist=None,ell=None,m=None):
@@ -1409,45 +2510,56 @@ class EvaluateSurrogate():
   # class (such as memory allocation)
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-  def _allocate_output_array(self, times, num_modes, mode_sum):
-    """ allocate memory for result of hp, hc.
+  def _num_samples(self, times):
+    """ number of time samples of an evaluation at times (None if using default)"""
+
+    if (times is not None):
+      return times.shape[0]
+    else:
+      return self._num_grid_samples
+
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _allocate_output_array(self, times, num_modes, mode_sum, zero_init=True, dtype=np.float64):
+    """ allocate memory for result of hp, hc, as (samples, num_modes) arrays.
 
     Input
     =====
     times     --- array of time samples. None if using default
     num_modes --- number of harmonic modes (cols). set to 1 if summation over modes
-    mode_sum  --- whether or not modes will be summed over (see code for why necessary)"""
+    mode_sum  --- whether or not modes will be summed over (see code for why necessary)
+    zero_init --- if False, the arrays are left uninitialized (every entry must be written)
+    dtype     --- floating point type of the arrays"""
 
 
-    # Determine the number of time samples #
-    if (times is not None):
-      sample_size = times.shape[0]
-    else:
-      sample_size = self.time_grid().shape[0]
+    sample_size = self._num_samples(times)
+    alloc = np.zeros if zero_init else np.empty
 
     # TODO: should the dtype be complex?
-    if(num_modes==1): # return as vector instead of array
-      hp_full = np.zeros(sample_size)
-      hc_full = np.zeros(sample_size)
-    else:
-      hp_full = np.zeros((sample_size,num_modes))
-      hc_full = np.zeros((sample_size,num_modes))
+    hp_full = alloc((sample_size,num_modes), dtype=dtype)
+    hc_full = alloc((sample_size,num_modes), dtype=dtype)
 
     return hp_full, hc_full
 
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-  def _generate_minus_m_mode(self,hp_mode,hc_mode,ell,m):
+  def _generate_minus_m_mode(self,hp_mode,hc_mode,ell,m,inplace=False):
     """ For m>0 positive modes hp_mode,hc_mode use h(l,-m) = (-1)^l h(l,m)^*
-        to compute the m<0 mode.
+        to compute the m<0 mode. If inplace, hp_mode and hc_mode are overwritten.
 
   See Eq. 78 of Kidder,Physical Review D 77, 044016 (2008), arXiv:0710.0614v1 [gr-qc]."""
 
     if (m<=0):
       raise ValueError('m must be nonnegative. m<0 will be generated for you from the m>0 mode.')
+
+    sign = 1 - 2*(ell & 1) # (-1)^ell
+    if inplace:
+      if sign < 0:
+        np.negative(hp_mode, out=hp_mode)
+      else:
+        np.negative(hc_mode, out=hc_mode)
     else:
-      hp_mode =   np.power(-1,ell) * hp_mode
-      hc_mode = - np.power(-1,ell) * hc_mode
+      hp_mode =   sign * hp_mode
+      hc_mode = - sign * hc_mode
 
     return hp_mode, hc_mode
 
@@ -1456,14 +2568,10 @@ class EvaluateSurrogate():
   def _extend_mode_list_minus_m(self,mode_list):
     """ from list of [(ell,m)] pairs return a new list which includes m<0 too."""
 
-    positive_modes = list(mode_list)
-    for ell,m in positive_modes:
-      if m>0:
-        mode_list.append((ell,-m))
-      if m<0:
-        raise ValueError('your list already has negative modes!')
+    if any(m<0 for _,m in mode_list):
+      raise ValueError('your list already has negative modes!')
 
-    return mode_list
+    return list(mode_list) + [(ell,-m) for ell,m in mode_list if m>0]
 
 
 ####################################################
@@ -29,6 +29,8 @@ THE SOFTWARE.
 
 import numpy as np
 import os as os
+import json
+import hashlib
 import h5py
 from .parametric_funcs import function_dict as my_funcs
 from .new.spline_evaluation import TensorSplineGrid, fast_tensor_spline_eval
@@ -114,6 +116,73 @@ def extract_mode_from_string(mode_str):
     raise ValueError
   return ell, emm
 
+# HDF5 chunk cache used when reading surrogate files. The default (1 MiB)
+# is smaller than a single basis matrix of most surrogates.
+h5_rdcc_nbytes = 256*1024**2
+h5_rdcc_nslots = 1000003 # a prime, as recommended by the HDF5 docs
+
+# helper function
+def open_h5(path, mode='r'):
+  ''' Open an HDF5 surrogate file with an enlarged chunk cache '''
+
+  try:
+    return h5py.File(path, mode, rdcc_nbytes=h5_rdcc_nbytes, rdcc_nslots=h5_rdcc_nslots)
+  except TypeError: # h5py < 2.9 does not expose the chunk cache
+    return h5py.File(path, mode)
+
+# helper function
+def prefetch_h5_group(group, prefix='', names=None):
+  ''' Read the datasets below an HDF5 group in a single pass over the group.
+  If names is given, only the datasets directly in the group with those
+  names are read. Returns a dict whose keys are prefix+(dataset path relative
+  to the group) and whose values are numpy arrays, which support the [:] and
+  [()] reads used on the datasets themselves. '''
+
+  data = {}
+  if names is not None:
+    for name in names:
+      obj = group.get(name)
+      if isinstance(obj, h5py.Dataset):
+        data[prefix+name] = np.asarray(obj[()])
+    return data
+
+  def read_dataset(name, obj):
+    if isinstance(obj, h5py.Dataset):
+      data[prefix+name] = np.asarray(obj[()])
+  group.visititems(read_dataset)
+  return data
+
+# Multi-mode text surrogates may list their single mode folders in a
+# manifest, so the modes are known without scanning the directory
+mode_manifest_json = 'manifest.json'
+
+# helper function
+def read_mode_manifest(path):
+  ''' List of ((ell, m), folder) read from the manifest of the multi-mode text
+  surrogate in directory path. Returns None if there is no manifest. '''
+
+  fname = os.path.join(path, mode_manifest_json)
+  if not os.path.isfile(fname):
+    return None
+  with open(fname) as fp:
+    manifest = json.load(fp)
+  return [((int(e['ell']), int(e['m'])), e['path'].rstrip('/')) for e in manifest]
+
+# helper function
+def write_mode_manifest(path):
+  ''' Write the manifest of the multi-mode text surrogate in directory path,
+  listing each single mode folder l#_m#_... found there. '''
+
+  manifest = []
+  for f in sorted(os.listdir(path)):
+    split_f = f.split('_')
+    if len(split_f) > 1 and split_f[0][:1] == 'l' and split_f[1][:1] == 'm' \
+        and os.path.isdir(os.path.join(path, f)):
+      manifest.append({'ell': int(split_f[0][1:]), 'm': int(split_f[1][1:]), 'path': f+'/'})
+  with open(os.path.join(path, mode_manifest_json), 'w') as fp:
+    json.dump(manifest, fp, indent=1)
+  return manifest
+
 ##############################################
 class SurrogateBaseIO:
   """
@@ -218,9 +287,29 @@ class SurrogateBaseIO:
   _R_2_txt             = 'R_2.txt'
   _R_h5                = 'R' # R_1.txt R_2.txt
 
+  # datasets stored in column-sized chunks by write_h5
+  _column_chunked_h5   = [_B_h5, _B_phase_h5, _B_im_h5, _V_h5, _R_h5]
+
   _t_units_txt         = 't_units.txt'
   _t_units_h5          = 't_units' # .txt
 
+  # datasets which load_h5 may read, the only ones it prefetches
+  _load_h5_datasets    = [_surrogate_ID_h5, _surrogate_mode_type_h5, _parameterization_h5,
+                          _tmin_h5, _tmax_h5, _dt_h5, _times_h5, _quadrature_weights_h5,
+                          _fit_min_h5, _fit_max_h5, _B_h5, _B_phase_h5, _B_im_h5,
+                          _affine_map_h5, _fit_type_phase_h5, _fit_type_amp_h5,
+                          _fit_type_re_h5, _fit_type_im_h5, _fit_type_norm_h5,
+                          _fitparams_phase_h5, _fitparams_amp_h5, _fitparams_re_h5,
+                          _fitparams_im_h5, _fitparams_norm_h5, _greedy_points_h5,
+                          _eim_indices_h5, _eim_indices_phase_h5, _eim_amp_h5,
+                          _eim_phase_h5, _eim_indices_im_h5, _eim_re_h5, _eim_im_h5,
+                          _V_h5, _R_h5, _t_units_h5, 'degree',
+                          'n_spline_knots', 'spline_knots',
+                          'n_spline_knots_amp', 'spline_knots_amp',
+                          'n_spline_knots_phase', 'spline_knots_phase',
+                          'n_spline_knots_re', 'spline_knots_re',
+                          'n_spline_knots_im', 'spline_knots_im']
+
 
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
@@ -298,7 +387,7 @@ class H5Surrogate(SurrogateBaseIO):
       if self.type == str:
         if self._mode == 'r':
           try:
-            self.file = h5py.File(file, 'r')
+            self.file = open_h5(file, 'r')
           except:
             pass
         if self._mode == 'w':
@@ -349,7 +438,7 @@ class H5Surrogate(SurrogateBaseIO):
     self.type = type(file)
     if self.type == str:
       try:
-        self.file = h5py.File(file, 'r')
+        self.file = open_h5(file, 'r')
       except:
         raise Exception("Cannot open file.")
     elif self.type == h5py._hl.files.File:
@@ -361,12 +450,17 @@ class H5Surrogate(SurrogateBaseIO):
     else:
       # Get keys in the given subdirectory
       self.keys = list(self.file[subdir[:-1]].keys())
+    keys = set(self.keys) # fast membership tests below
+
+    ### read all of the mode's datasets used below at once, rather than one by one ###
+    data = prefetch_h5_group(self.file[subdir[:-1]] if subdir else self.file, subdir,
+                             names=self._load_h5_datasets)
       
     ### Get surrogateID ####
     name = self.file.filename.split('/')[-1].split('.')[0]
     
-    if self._surrogate_ID_h5 in self.keys:
-      self.surrogateID = self.chars_to_string(self.file[subdir+self._surrogate_ID_h5][()])
+    if self._surrogate_ID_h5 in keys:
+      self.surrogateID = self.chars_to_string(data[subdir+self._surrogate_ID_h5][()])
       if self.surrogateID != name:
         print("\n>>> Warning: surrogateID does not have expected name.")
     else:
@@ -380,30 +474,30 @@ class H5Surrogate(SurrogateBaseIO):
     
     ### Get type of basis used to build surrogate 
     # (e.g., basis for complex waveform or for amplitude and phase)
-    self.surrogate_mode_type = self.chars_to_string(self.file[subdir+self._surrogate_mode_type_h5][()])
+    self.surrogate_mode_type = self.chars_to_string(data[subdir+self._surrogate_mode_type_h5][()])
     
     ### Unpack time info ###
-    #self.tmin = self.file[subdir+self._tmin_h5][()]
-    #self.tmax = self.file[subdir+self._tmax_h5][()]
+    #self.tmin = data[subdir+self._tmin_h5][()]
+    #self.tmax = data[subdir+self._tmax_h5][()]
     #if self._dt_h5 in self.keys:
-    #  self.dt = self.file[subdir+self._dt_h5][()]
+    #  self.dt = data[subdir+self._dt_h5][()]
     #  self.times = np.arange(self.tmin, self.tmax+self.dt, self.dt)
     #  self.quadrature_weights = self.dt * np.ones(self.times.shape)
 
-    if self._dt_h5 in self.keys and self._tmin_h5 in self.keys:
+    if self._dt_h5 in keys and self._tmin_h5 in keys:
       print(">>> tmin, tmax, dt are depricated as of 11/23/2016.")
-      self.tmin = self.file[subdir+self._tmin_h5][()]
-      self.tmax = self.file[subdir+self._tmax_h5][()]
-      self.dt = self.file[subdir+self._dt_h5][()]
+      self.tmin = data[subdir+self._tmin_h5][()]
+      self.tmax = data[subdir+self._tmax_h5][()]
+      self.dt = data[subdir+self._dt_h5][()]
       self.times = np.arange(self.tmin, self.tmax+self.dt, self.dt)
       self.quadrature_weights = self.dt * np.ones(self.times.shape)
     else:
-      self.times = self.file[subdir+self._times_h5][:]
+      self.times = data[subdir+self._times_h5][:]
       self.tmin  = self.times[0]
       self.tmax  = self.times[-1]
-      try:
-        self.quadrature_weights = self.file[subdir+self._quadrature_weights_h5][:]
-      except:
+      if self._quadrature_weights_h5 in keys:
+        self.quadrature_weights = data[subdir+self._quadrature_weights_h5][:]
+      else:
         self.quadrature_weights = (self.times[1] - self.times[0]) * np.ones(self.times.shape)
         print("\n>>> Warning: Guessing quadrature weights to be identical with %f"%self.quadrature_weights[0])
 
@@ -412,8 +506,8 @@ class H5Surrogate(SurrogateBaseIO):
     #if self._quadrature_weights_h5 not in self.__dict__.keys():
     #  print "\n>>> Warning: No quadrature weights found or generated."
     
-    if self._t_units_h5 in self.keys:
-      self.t_units = self.chars_to_string(self.file[subdir+self._t_units_h5][()])
+    if self._t_units_h5 in keys:
+      self.t_units = self.chars_to_string(data[subdir+self._t_units_h5][()])
     else:
       self.t_units = 'TOverMtot'
 
@@ -424,8 +518,8 @@ class H5Surrogate(SurrogateBaseIO):
       raise ValueError('surrogates must be dimensionless')
 
     ### Greedy points (ordered by RB selection) ###
-    if self._greedy_points_h5 in self.keys:
-      self.greedy_points = self.file[subdir+self._greedy_points_h5][:]
+    if self._greedy_points_h5 in keys:
+      self.greedy_points = data[subdir+self._greedy_points_h5][:]
     else:
       self.greedy_points = None
       print("Cannot load greedy points...OK")
@@ -433,19 +527,19 @@ class H5Surrogate(SurrogateBaseIO):
     ### Empirical time index (ordered by EIM selection) ###
     if self.surrogate_mode_type == 'amp_phase_basis':
       try:
-        self.eim_indices_amp = self.file[subdir+self._eim_indices_h5][:]
-        self.eim_indices_phase = self.file[subdir+self._eim_indices_phase_h5][:]
+        self.eim_indices_amp = data[subdir+self._eim_indices_h5][:]
+        self.eim_indices_phase = data[subdir+self._eim_indices_phase_h5][:]
       except KeyError:
         print("Cannot load eim points...OK") 
     elif self.surrogate_mode_type  == 'waveform_basis':
       try:
-        self.eim_indices = self.file[subdir+self._eim_indices_h5][:]
+        self.eim_indices = data[subdir+self._eim_indices_h5][:]
       except KeyError:
         print("Cannot load eim points...OK")
     elif self.surrogate_mode_type == 'coorb_waveform_basis':
       try:
-        self.eim_indices_re = self.file[subdir+self._eim_indices_h5][:]
-        self.eim_indices_im = self.file[subdir+self._eim_indices_im_h5][:]
+        self.eim_indices_re = data[subdir+self._eim_indices_h5][:]
+        self.eim_indices_im = data[subdir+self._eim_indices_im_h5][:]
       except KeyError:
         print("Cannot load eim points...OK")
     else:
@@ -453,41 +547,41 @@ class H5Surrogate(SurrogateBaseIO):
 
     ### Complex B coefficients ###
     if self.surrogate_mode_type == 'amp_phase_basis':
-      self.B_1 = self.file[subdir+self._B_h5][:]
-      self.B_2 = self.file[subdir+self._B_phase_h5][:]
+      self.B_1 = data[subdir+self._B_h5][:]
+      self.B_2 = data[subdir+self._B_phase_h5][:]
     elif self.surrogate_mode_type  == 'waveform_basis':
-      self.B = self.file[subdir+self._B_h5][:]	
+      self.B = data[subdir+self._B_h5][:]	
     # changes in code to allow for coorbital mode surrogates
     elif self.surrogate_mode_type == 'coorb_waveform_basis':
-      self.B_1 = self.file[subdir+self._B_h5][:]
-      self.B_2 = self.file[subdir+self._B_im_h5][:] 
+      self.B_1 = data[subdir+self._B_h5][:]
+      self.B_2 = data[subdir+self._B_im_h5][:] 
     else:
       raise ValueError('invalid surrogate type')
 
     ### Information about phase/amp parametric fit ###
-    if self._affine_map_h5 in self.keys:
-      self.affine_map = self.chars_to_string(self.file[subdir+self._affine_map_h5][()])
+    if self._affine_map_h5 in keys:
+      self.affine_map = self.chars_to_string(data[subdir+self._affine_map_h5][()])
     else:
       self.affine_map = 'none'
     if self.surrogate_mode_type  == 'coorb_waveform_basis':
-      self.fitparams_re = self.file[subdir+self._fitparams_re_h5][:]
-      self.fitparams_im = self.file[subdir+self._fitparams_im_h5][:]
+      self.fitparams_re = data[subdir+self._fitparams_re_h5][:]
+      self.fitparams_im = data[subdir+self._fitparams_im_h5][:]
     else:
-      self.fitparams_amp = self.file[subdir+self._fitparams_amp_h5][:]
-      self.fitparams_phase = self.file[subdir+self._fitparams_phase_h5][:]
-    self.fit_min = self.file[subdir+self._fit_min_h5][()]
-    self.fit_max = self.file[subdir+self._fit_max_h5][()]
+      self.fitparams_amp = data[subdir+self._fitparams_amp_h5][:]
+      self.fitparams_phase = data[subdir+self._fitparams_phase_h5][:]
+    self.fit_min = data[subdir+self._fit_min_h5][()]
+    self.fit_max = data[subdir+self._fit_max_h5][()]
     self.fit_interval = np.array( [self.fit_min, self.fit_max] )
 
     # NOTE : this part of code is poorly written
     # to ensure minimal code change, I have kept the naming fit_type_amp and fit_type_phase
     # even though fit_type_re and fit_type_im would have been a better choice
     if self.surrogate_mode_type  == 'coorb_waveform_basis':
-      self.fit_type_amp = self.chars_to_string(self.file[subdir+self._fit_type_re_h5][()])
-      self.fit_type_phase = self.chars_to_string(self.file[subdir+self._fit_type_im_h5][()])
+      self.fit_type_amp = self.chars_to_string(data[subdir+self._fit_type_re_h5][()])
+      self.fit_type_phase = self.chars_to_string(data[subdir+self._fit_type_im_h5][()])
     else:
-      self.fit_type_amp = self.chars_to_string(self.file[subdir+self._fit_type_amp_h5][()])
-      self.fit_type_phase = self.chars_to_string(self.file[subdir+self._fit_type_phase_h5][()])
+      self.fit_type_amp = self.chars_to_string(data[subdir+self._fit_type_amp_h5][()])
+      self.fit_type_phase = self.chars_to_string(data[subdir+self._fit_type_phase_h5][()])
 
     # TODO: node fitting functions need to be generalized to their own class by using gws.new
     if self.fit_type_amp == "fast_spline_real" and self.fit_type_phase == "fast_spline_imag":
@@ -496,14 +590,14 @@ class H5Surrogate(SurrogateBaseIO):
 
       # TODO: promote data fields (e.g. splint_knots) to SurrogateBaseIO data -- but better to use gws.new
       try: # TODO: 1d surrogates should include n_spline_knots in their data
-        n_spline_knots = self.file[subdir+'n_spline_knots'][:]
-        remaining_spline_knots = self.file[subdir+'spline_knots'][:]
+        n_spline_knots = data[subdir+'n_spline_knots'][:]
+        remaining_spline_knots = data[subdir+'spline_knots'][:]
         spline_knots = []
         for n in n_spline_knots:
           spline_knots.append(remaining_spline_knots[:n])
           remaining_spline_knots = remaining_spline_knots[n:]
       except KeyError: # if n_spline_knots does not exist a KeyError is raised. Old 1d surrogate assumed
-        spline_knots = [self.file[subdir+'spline_knots'][:]]
+        spline_knots = [data[subdir+'spline_knots'][:]]
 
       # setup the function which will be used to evaluate splines
       # TODO: unfortunately, this creates a new grid for each mode.
@@ -539,11 +633,11 @@ class H5Surrogate(SurrogateBaseIO):
       ## =====================================================================================
       if self.surrogateID=="BHPTNRSur1dq1e4":
         if self.surrogate_mode_type  == 'amp_phase_basis': # BHPTNRSur1dq1e4's 22 mode is of type amp_phase_basis
-          n_spline_knots_amp = self.file[subdir+'n_spline_knots_amp'][:]
-          n_spline_knots_phase = self.file[subdir+'n_spline_knots_phase'][:]
+          n_spline_knots_amp = data[subdir+'n_spline_knots_amp'][:]
+          n_spline_knots_phase = data[subdir+'n_spline_knots_phase'][:]
 
-          spline_knots_amp = self.file[subdir+'spline_knots_amp'][:]
-          spline_knots_phase = self.file[subdir+'spline_knots_phase'][:]
+          spline_knots_amp = data[subdir+'spline_knots_amp'][:]
+          spline_knots_phase = data[subdir+'spline_knots_phase'][:]
 
           # pack necessary data up so the spline function can be called
           # as self.amp_fit_func(self.fitparams_amp[jj,:], x_0)
@@ -551,7 +645,7 @@ class H5Surrogate(SurrogateBaseIO):
           num_fits_phase = self.fitparams_phase.shape[0]
           fitparams_amp = []
           fitparams_phase = []
-          degree = int(self.file[subdir+'degree'][:]) # must be int for scipy (> 1.5.2) splev to work
+          degree = int(data[subdir+'degree'][:]) # must be int for scipy (> 1.5.2) splev to work
           for i in range(num_fits_amp):
             fitparams_amp.append([spline_knots_amp[i], self.fitparams_amp[i], degree])
           for i in range(num_fits_phase):
@@ -565,11 +659,11 @@ class H5Surrogate(SurrogateBaseIO):
           self.amp_fit_func   = my_funcs[self.fit_type_amp]
           self.phase_fit_func = my_funcs[self.fit_type_phase]
         elif self.surrogate_mode_type  == 'coorb_waveform_basis':  # BHPTNRSur1dq1e4's higher order modes are coorb type
-          n_spline_knots_re = self.file[subdir+'n_spline_knots_re'][:]
-          n_spline_knots_im = self.file[subdir+'n_spline_knots_im'][:]
+          n_spline_knots_re = data[subdir+'n_spline_knots_re'][:]
+          n_spline_knots_im = data[subdir+'n_spline_knots_im'][:]
 
-          spline_knots_re = self.file[subdir+'spline_knots_re'][:]
-          spline_knots_im = self.file[subdir+'spline_knots_im'][:]
+          spline_knots_re = data[subdir+'spline_knots_re'][:]
+          spline_knots_im = data[subdir+'spline_knots_im'][:]
 
           # pack necessary data up so the spline function can be called
           # as self.amp_fit_func(self.fitparams_amp[jj,:], x_0)
@@ -577,7 +671,7 @@ class H5Surrogate(SurrogateBaseIO):
           num_fits_im = self.fitparams_im.shape[0]
           fitparams_re = []
           fitparams_im = []
-          degree = int(self.file[subdir+'degree'][:]) # must be int for scipy (> 1.5.2) splev to work
+          degree = int(data[subdir+'degree'][:]) # must be int for scipy (> 1.5.2) splev to work
           for i in range(num_fits_re):
             fitparams_re.append([spline_knots_re[i], self.fitparams_re[i], degree])
           for i in range(num_fits_im):
@@ -591,15 +685,15 @@ class H5Surrogate(SurrogateBaseIO):
           self.re_fit_func   = my_funcs[self.fit_type_amp]
           self.im_fit_func = my_funcs[self.fit_type_phase]
       else: # for all other models, it will take the usual route
-        n_spline_knots = self.file[subdir+'n_spline_knots'][:]
-        spline_knots = self.file[subdir+'spline_knots'][:]
+        n_spline_knots = data[subdir+'n_spline_knots'][:]
+        spline_knots = data[subdir+'spline_knots'][:]
 
         # pack necessary data up so the spline function can be called
         # as self.amp_fit_func(self.fitparams_amp[jj,:], x_0)
         num_fits = self.fitparams_amp.shape[0]
         fitparams_amp = []
         fitparams_phase = []
-        degree = int(self.file[subdir+'degree'][:]) # must be int for scipy (> 1.5.2) splev to work
+        degree = int(data[subdir+'degree'][:]) # must be int for scipy (> 1.5.2) splev to work
         for i in range(num_fits):
           fitparams_amp.append([spline_knots, self.fitparams_amp[i,:], degree])
           fitparams_phase.append([spline_knots, self.fitparams_phase[i,:], degree])
@@ -616,35 +710,35 @@ class H5Surrogate(SurrogateBaseIO):
       self.phase_fit_func = my_funcs[self.fit_type_phase]
 
 
-    if self._fit_type_norm_h5 in self.keys:
+    if self._fit_type_norm_h5 in keys:
       try:
-        self.fitparams_norm = self.file[subdir+self._fitparams_norm_h5][:]
+        self.fitparams_norm = data[subdir+self._fitparams_norm_h5][:]
       except KeyError:
       	self.fitparams_norm = None
       	print("setting norm fitparams to None...")
-      self.fit_type_norm = self.chars_to_string(self.file[subdir+self._fit_type_norm_h5][()])
+      self.fit_type_norm = self.chars_to_string(data[subdir+self._fit_type_norm_h5][()])
       self.norm_fit_func  = my_funcs[self.fit_type_norm]
       self.norms = True
     else:
       self.norms = False
     
-    if self._eim_amp_h5 in self.keys:
-      self.eim_amp = self.file[subdir+self._eim_amp_h5][:]
+    if self._eim_amp_h5 in keys:
+      self.eim_amp = data[subdir+self._eim_amp_h5][:]
     
-    if self._eim_phase_h5 in self.keys:
-      self.eim_phase = self.file[subdir+self._eim_phase_h5][:]
+    if self._eim_phase_h5 in keys:
+      self.eim_phase = data[subdir+self._eim_phase_h5][:]
     
-    if self._eim_re_h5 in self.keys:
-      self.eim_re = self.file[subdir+self._eim_re_h5][:]
+    if self._eim_re_h5 in keys:
+      self.eim_re = data[subdir+self._eim_re_h5][:]
     
-    if self._eim_im_h5 in self.keys:
-      self.eim_im = self.file[subdir+self._eim_im_h5][:]
+    if self._eim_im_h5 in keys:
+      self.eim_im = data[subdir+self._eim_im_h5][:]
     
     ### Transpose matrices if surrogate was built using ROMpy ###
     transposeB = False
     #if not self.surrogate_mode_type == 'amp_phase_basis':
     if self.surrogate_mode_type not in ['amp_phase_basis','coorb_waveform_basis']:
-      Bshape = np.shape(self.B)
+      Bshape = self.B.shape
     
       if Bshape[0] < Bshape[1]:
         transposeB = True
@@ -656,29 +750,29 @@ class H5Surrogate(SurrogateBaseIO):
         self.dim_rb = Bshape[1]
         self.time_samples = Bshape[0]
     else: # TODO: elif... to match other similar control statements
-        Bshape = np.shape(self.B_1)
+        Bshape = self.B_1.shape
         self.dim_rb = Bshape[0]
         self.time_samples = Bshape[1]
-        self.dim_rb_phase = np.shape(self.B_2)[0]
+        self.dim_rb_phase = self.B_2.shape[0]
 
     ### Vandermonde V such that E (orthogonal basis) is E = BV ###
-    if self._V_h5 in self.keys:
-      self.V = self.file[subdir+self._V_h5][:]
+    if self._V_h5 in keys:
+      self.V = data[subdir+self._V_h5][:]
       if transposeB:
         self.V = np.transpose(self.V)
     else:
        self.V = None
     
     ### R matrix such that waveform basis H = ER ###
-    if self._R_h5 in self.keys:
-      self.R = self.file[subdir+self._R_h5][:]
+    if self._R_h5 in keys:
+      self.R = data[subdir+self._R_h5][:]
       if transposeB:
         self.R = np.transpose(self.R)
     else:
       self.R = None
         
     ### Information about surrogate's parameterization ###
-    self.parameterization = self.chars_to_string(self.file[subdir+self._parameterization_h5][()])
+    self.parameterization = self.chars_to_string(data[subdir+self._parameterization_h5][()])
     self.get_surr_params  = my_funcs[self.parameterization]
     
     if closeQ:
@@ -781,6 +875,10 @@ class H5Surrogate(SurrogateBaseIO):
           if dtype is str:
             chars = self.string_to_chars(data_to_write[kk])
             group.create_dataset(kk, data=chars, dtype='int')
+          elif dtype is np.ndarray and kk in self._column_chunked_h5 and data_to_write[kk].ndim == 2:
+            # basis matrices are read one column at a time, so chunk by column
+            group.create_dataset(kk, data=data_to_write[kk], dtype=data_to_write[kk].dtype, compression='gzip',
+                                 shuffle=True, chunks=(data_to_write[kk].shape[0], 1))
           elif dtype is np.ndarray:
             group.create_dataset(kk, data=data_to_write[kk], dtype=data_to_write[kk].dtype, compression='gzip')
           elif isinstance(data_to_write[kk], collections.Callable):
@@ -808,11 +906,15 @@ class TextSurrogateRead(SurrogateBaseIO):
   __doc__+=surrogate_description
 
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-  def __init__(self, sdir):
+  def __init__(self, sdir, text_cache=None):
     """initialize single-mode surrogate defined from text files 
-       located in directory sdir. """
+       located in directory sdir.
+
+       text_cache: None (default) to parse the text files on every load, or a
+       directory in which binary copies of them are kept, see _cached_loadtxt"""
 
     surrogate_load_info = '' # add to string, display after loading
+    self._text_cache = text_cache
 
     ### sdir is defined to be the surrogate's ID ###
     self.surrogateID = sdir
@@ -822,8 +924,8 @@ class TextSurrogateRead(SurrogateBaseIO):
       self.get_string_key(sdir+self._surrogate_mode_type_txt)
 
     ### Surrogate's sampling rate and mass ratio (for fits) ###
-    self.time_info    = np.loadtxt(sdir+self._time_info_txt)
-    self.fit_interval = np.loadtxt(sdir+self._fit_interval_txt)
+    self.time_info    = self._cached_loadtxt(sdir+self._time_info_txt)
+    self.fit_interval = self._cached_loadtxt(sdir+self._fit_interval_txt)
     self.fit_min = self.fit_interval[0]
     self.fit_max = self.fit_interval[1]
 
@@ -859,8 +961,8 @@ class TextSurrogateRead(SurrogateBaseIO):
       raise ValueError('surrogates must be dimensionless')
 
     ### Complex B coefficients - set ndim=2 in case only 1 basis vector ###
-    B_1    = np.loadtxt(sdir+self._B_1_txt,ndmin=2)
-    B_2    = np.loadtxt(sdir+self._B_2_txt,ndmin=2)
+    B_1    = self._cached_loadtxt(sdir+self._B_1_txt,mmap_mode='r',ndmin=2)
+    B_2    = self._cached_loadtxt(sdir+self._B_2_txt,mmap_mode='r',ndmin=2)
 
     ### Consistency check that self.time_samples = B_X.shape[0] ###
     if(self.time_samples != B_1.shape[0] or
@@ -894,8 +996,8 @@ class TextSurrogateRead(SurrogateBaseIO):
       raise ValueError('invalid surrogate type')
 
     ### Information about phase/amp parametric fits ###
-    self.fitparams_phase = np.loadtxt(sdir+self._fitparams_phase_txt,ndmin=2)
-    self.fitparams_amp   = np.loadtxt(sdir+self._fitparams_amp_txt,ndmin=2)
+    self.fitparams_phase = self._cached_loadtxt(sdir+self._fitparams_phase_txt,ndmin=2)
+    self.fitparams_amp   = self._cached_loadtxt(sdir+self._fitparams_amp_txt,ndmin=2)
 
     self.affine_map      = self.get_string_key(sdir+self._affine_map_txt)
 
@@ -914,8 +1016,8 @@ class TextSurrogateRead(SurrogateBaseIO):
 
     ### Vandermonde V such that E (orthogonal basis) is E = BV ###
     try:
-      V_1    = np.loadtxt(sdir+self._V_1_txt)
-      V_2    = np.loadtxt(sdir+self._V_2_txt)
+      V_1    = self._cached_loadtxt(sdir+self._V_1_txt)
+      V_2    = self._cached_loadtxt(sdir+self._V_2_txt)
       self.V = V_1 + (1j)*V_2
     except IOError:
       surrogate_load_info +='Vandermonde not found, '
@@ -924,22 +1026,22 @@ class TextSurrogateRead(SurrogateBaseIO):
 
     ### greedy points (ordered by RB selection) ###
     try:
-      self.greedy_points = np.loadtxt(sdir+self._greedy_points_txt)
+      self.greedy_points = self._cached_loadtxt(sdir+self._greedy_points_txt)
     except IOError:
       surrogate_load_info += 'Greedy points not found, '
       self.greedy_points = False
 
     ### R matrix such that waveform basis H = ER ###
     try:
-      R_1    = np.loadtxt(sdir+self._R_1_txt)
-      R_2    = np.loadtxt(sdir+self._R_2_txt)
+      R_1    = self._cached_loadtxt(sdir+self._R_1_txt)
+      R_2    = self._cached_loadtxt(sdir+self._R_2_txt)
       self.R = R_1 + (1j)*R_2
     except IOError:
       surrogate_load_info += 'R matrix not found, '
       self.R = False
 
     try: 
-      self.fitparams_norm = np.loadtxt(sdir+self._fitparams_norm_txt)
+      self.fitparams_norm = self._cached_loadtxt(sdir+self._fitparams_norm_txt)
       self.fit_type_norm  = self.get_string_key(sdir+self._fit_type_norm_txt)
       self.norm_fit_func  = my_funcs[self.fit_type_norm]
       self.norms = True
@@ -949,13 +1051,58 @@ class TextSurrogateRead(SurrogateBaseIO):
 
     ### empirical time index (ordered by EIM selection) ###
     try:
-      self.eim_indices = np.loadtxt(sdir+self._eim_indices_txt,dtype=int)
+      self.eim_indices = self._cached_loadtxt(sdir+self._eim_indices_txt,dtype=int)
     except IOError:
       surrogate_load_info += 'EIM indices not found.'
       self.eim_indices = False
 
     #print surrogate_load_info #Q: should we display this?
 
+  #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+  def _cached_loadtxt(self, fname, mmap_mode=None, **kwargs):
+    """ np.loadtxt(fname, **kwargs), cached as a binary .npy file in the
+    directory self._text_cache. Without a cache directory this is np.loadtxt.
+
+    The cache file is named after fname and a hash of its absolute path and
+    kwargs, and is (re)written whenever it is missing or older than fname.
+    Caching is silently skipped if the cache directory is not writable. With
+    mmap_mode='r' the array is returned memory mapped from the cache (or,
+    if it could not be written, read-only in memory). As with np.loadtxt,
+    an IOError is raised if fname does not exist."""
+
+    if self._text_cache is None:
+      return np.loadtxt(fname, **kwargs)
+
+    key   = repr((os.path.abspath(fname), sorted(kwargs.items())))
+    cache = os.path.join(self._text_cache, '%s.%s.npy'%(os.path.basename(fname),
+                         hashlib.sha1(key.encode()).hexdigest()[:16]))
+    txt_mtime = os.stat(fname).st_mtime
+
+    if os.path.isfile(cache) and os.stat(cache).st_mtime >= txt_mtime:
+      try:
+        return np.load(cache, mmap_mode=mmap_mode)
+      except (IOError, ValueError):
+        pass # corrupted cache, reload from text
+
+    data = np.loadtxt(fname, **kwargs)
+    tmp  = cache+'.%d.tmp'%os.getpid()
+    try:
+      if not os.path.isdir(self._text_cache):
+        os.makedirs(self._text_cache)
+      with open(tmp, 'wb') as fp:
+        np.save(fp, data)
+      os.rename(tmp, cache)
+    except (IOError, OSError):
+      try:
+        os.remove(tmp)
+      except OSError:
+        pass
+      if mmap_mode is not None:
+        data.flags.writeable = False
+      return data
+    # as on later loads, so the result does not depend on the cache's state
+    return np.load(cache, mmap_mode=mmap_mode)
+
   #!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
   def get_string_key(self,fname):
     """ return a single word string from file """
@@ -4,12 +4,39 @@ Simple unit tests.
 
 from __future__ import division
 import nose
+import pytest
 import numpy as np
 import gwsurrogate as gws
 import os
 
 path_to_surrogate = 'tutorial/TutorialSurrogate/EOB_q1_2_NoSpin_Mode22/'
 
+@pytest.fixture(scope='module')
+def EOBNRv2_sur():
+  """ tutorial surrogate shared by tests that only evaluate it"""
+  return gws.EvaluateSurrogate(path_to_surrogate)
+
+@pytest.fixture
+def surrogate_dir(tmp_path):
+  """ writable copy of the tutorial surrogate whose (2,2) mode is also copied
+  as a (3,3) mode, for tests that write files or need several modes"""
+
+  import shutil
+  sur_dir = str(tmp_path)+'/'
+  for mode in ['l2_m2', 'l3_m3']:
+    shutil.copytree(path_to_surrogate+'l2_m2_len12239M_SurID19poly', sur_dir+mode+'_len12239M_SurID19poly')
+  return sur_dir
+
+def assert_waveforms_close(waveforms, expected, tol=0.0):
+  """ each waveform agrees with the expected one to tol times its peak,
+  or exactly if tol is 0"""
+
+  for h, h_expected in zip(waveforms, expected):
+    if tol == 0.0:
+      np.testing.assert_array_equal(h, h_expected)
+    else:
+      np.testing.assert_allclose(h, h_expected, rtol=0.0, atol=tol*np.max(np.abs(h_expected)))
+
 def test_orbital_symmetry_flags():
   # TODO: add 4d2s -- this will give non-trival combinations of this flag
   """ Check valid combinations of orbital symmetry flags"""
@@ -32,3 +59,369 @@ def test_orbital_symmetry_flags():
     modes, t, hp, hc = EOBNRv2_sur(q=1.14,ell=[2],m=[2],mode_sum=False,fake_neg_modes=True)
   except ValueError:
     pass
+
+def test_batched_fit_functions():
+  """ Batched fitting functions agree with row-by-row evaluation"""
+
+  from gwsurrogate.parametric_funcs import function_dict, batch_function_dict
+
+  coeffs = np.random.uniform(0.1, 1.0, size=(7,5))
+  for key, batch_func in batch_function_dict.items():
+    x = 1.6 if key in ['ampfitfn1_1d', 'ampfitfn2_1d', 'phifitfn1_1d'] else 0.2
+    expected = np.array([function_dict[key](cc, x) for cc in coeffs])
+    np.testing.assert_allclose(batch_func(coeffs, x), expected, rtol=1.e-14, atol=0.0)
+
+def test_h_sur_batch():
+  """ Batched surrogate evaluation agrees with one evaluation per parameter"""
+
+  EOBNRv2_sur = gws.EvaluateSingleModeSurrogate(path_to_surrogate+'l2_m2_len12239M_SurID19poly/')
+
+  qs = np.array([1.1, 1.45, 1.9])
+  hp, hc = EOBNRv2_sur._h_sur_batch(qs)
+  for ii, q in enumerate(qs):
+    hp_q, hc_q = EOBNRv2_sur._h_sur(q)
+    np.testing.assert_allclose(hp[:,ii], hp_q, rtol=0.0, atol=1.e-14)
+    np.testing.assert_allclose(hc[:,ii], hc_q, rtol=0.0, atol=1.e-14)
+
+def test_float32_basis(EOBNRv2_sur):
+  """ Single precision basis agrees with the default double precision one"""
+
+  sur32 = gws.EvaluateSurrogate(path_to_surrogate, basis_dtype=np.float32)
+
+  t, hp32, hc32 = sur32(q=1.3, theta=0.4, phi=0.2)
+  assert hp32.dtype == np.float64
+  assert_waveforms_close((hp32, hc32), EOBNRv2_sur(q=1.3, theta=0.4, phi=0.2)[1:], 1.e-5)
+
+def test_complex_basis():
+  """ B is assembled once from its stored real and imaginary parts"""
+
+  EOBNRv2_sur = gws.EvaluateSingleModeSurrogate(path_to_surrogate+'l2_m2_len12239M_SurID19poly/')
+  B = EOBNRv2_sur.B
+  assert EOBNRv2_sur.B is B
+  np.testing.assert_array_equal(B, EOBNRv2_sur.B_re + 1j*EOBNRv2_sur.B_im)
+
+def test_fused_mode_sum(EOBNRv2_sur):
+  """ Summing modes with the stacked bases agrees with a mode-by-mode sum"""
+
+  from gwtools.harmonics import sYlm
+
+  theta, phi, z_rot = 0.4, 1.2, 0.7
+
+  t, hp, hc = EOBNRv2_sur(q=1.3, theta=theta, phi=phi, z_rot=z_rot)
+  modes, t, hp_modes, hc_modes = EOBNRv2_sur(q=1.3, mode_sum=False)
+
+  h_expected = np.zeros(t.shape, dtype=complex)
+  for ii, (ell, m) in enumerate(modes):
+    h_mode = (hp_modes[:,ii] + 1.j*hc_modes[:,ii])*np.exp(1.j*m*z_rot)
+    h_expected += sYlm(-2, ll=ell, mm=m, theta=theta, phi=phi)*h_mode
+
+  assert_waveforms_close((hp, hc), (h_expected.real, h_expected.imag), 1.e-13)
+
+def test_mode_manifest(surrogate_dir):
+  """ Modes listed in a manifest are loaded as when scanning the directory"""
+
+  from gwsurrogate.surrogateIO import write_mode_manifest
+
+  scanned_sur = gws.EvaluateSurrogate(surrogate_dir)
+
+  manifest = write_mode_manifest(surrogate_dir)
+  assert [(e['ell'], e['m']) for e in manifest] == [(2,2), (3,3)]
+  manifest_sur = gws.EvaluateSurrogate(surrogate_dir)
+  assert sorted(manifest_sur.single_mode_dict.keys()) == sorted(scanned_sur.single_mode_dict.keys())
+
+  assert_waveforms_close(manifest_sur(q=1.3, theta=0.4, phi=0.2), scanned_sur(q=1.3, theta=0.4, phi=0.2))
+
+def test_basis_mmap(surrogate_dir):
+  """ Memory mapped bases give the same waveforms as in-memory ones"""
+
+  t, hp, hc = gws.EvaluateSurrogate(surrogate_dir)(q=1.3, theta=0.4, phi=0.2)
+  for ii in range(2): # writes, then reads, the cached basis
+    mmap_sur = gws.EvaluateSurrogate(surrogate_dir, basis_mmap=True)
+    assert isinstance(mmap_sur.single_mode_dict[(2,2)].B_re, np.memmap)
+    assert_waveforms_close(mmap_sur(q=1.3, theta=0.4, phi=0.2)[1:], (hp, hc), 1.e-13)
+
+def test_resample_cache():
+  """ Evaluations at repeated times reuse the cached design matrix"""
+
+  EOBNRv2_sur = gws.EvaluateSingleModeSurrogate(path_to_surrogate+'l2_m2_len12239M_SurID19poly/')
+  times = np.linspace(EOBNRv2_sur.tmin - 10., EOBNRv2_sur.tmax + 10., 3001)
+
+  hp, hc = EOBNRv2_sur._h_sur(1.3, times=times)
+  re_B, im_B = EOBNRv2_sur._resample_B_reim(times)
+  h_EIM = EOBNRv2_sur._eim_coeffs(1.3, 'waveform_basis')
+  scale = np.max(np.abs(hp + 1j*hc))
+  np.testing.assert_allclose(hp, np.dot(re_B, h_EIM.real) - np.dot(im_B, h_EIM.imag), rtol=0.0, atol=1.e-14*scale)
+  np.testing.assert_allclose(hc, np.dot(re_B, h_EIM.imag) + np.dot(im_B, h_EIM.real), rtol=0.0, atol=1.e-14*scale)
+
+  for ii in range(EOBNRv2_sur._design_cache_size + 2):
+    EOBNRv2_sur._h_sur(1.3, times=times[ii:])
+  assert len(EOBNRv2_sur._design_cache) == EOBNRv2_sur._design_cache_size
+  hp_cached, hc_cached = EOBNRv2_sur._h_sur(1.3, times=times.copy())
+  np.testing.assert_array_equal(hp_cached, hp)
+
+def test_h_eim_polyval_kernel():
+  """ Compiled EIM coefficients agree with the NumPy polyval path"""
+
+  pytest.importorskip('numba')
+  from gwsurrogate._kernels import h_eim_polyval
+
+  amp_coeffs, phase_coeffs = np.random.uniform(-1, 1, size=(2,6,4))
+  norm_coeffs = np.random.uniform(0.5, 1, size=3)
+  x_0 = 1.3
+  amp = np.array([np.polyval(c, x_0) for c in amp_coeffs])
+  phase = np.array([np.polyval(c, x_0) for c in phase_coeffs])
+  for has_norm, nrm in [(False, 1.0), (True, np.polyval(norm_coeffs, x_0))]:
+    h_EIM = h_eim_polyval(amp_coeffs, phase_coeffs, norm_coeffs, has_norm, x_0)
+    np.testing.assert_allclose(h_EIM[:,0] + 1.j*h_EIM[:,1], nrm*amp*np.exp(1.j*phase), rtol=0.0, atol=1.e-14)
+
+def test_fast_spline_kernel():
+  """ Compiled fast_spline basis product agrees with np.dot"""
+
+  pytest.importorskip('numba')
+  from gwsurrogate._kernels import h_sur_fast_spline
+
+  B = np.random.uniform(-1, 1, size=(50,6)) + 1.j*np.random.uniform(-1, 1, size=(50,6))
+  h = np.random.uniform(-1, 1, size=6) + 1.j*np.random.uniform(-1, 1, size=6)
+  hp, hc = np.empty(50), np.empty(50)
+  h_sur_fast_spline(np.ascontiguousarray(B.real), np.ascontiguousarray(B.imag), h.real, h.imag, 1.7, hp, hc)
+  np.testing.assert_allclose(hp + 1.j*hc, 1.7*np.dot(B, h), rtol=0.0, atol=1.e-13)
+
+def test_ylm_table():
+  """ Tabulated harmonics agree with sYlm and are reused at fixed angles"""
+
+  from gwtools.harmonics import sYlm
+
+  EOBNRv2_sur = gws.EvaluateSurrogate(path_to_surrogate)
+  modes = [(2,2), (2,-2), (3,3)]
+  ylm = EOBNRv2_sur.get_ylm_table(0.4, 1.2, modes)
+  for (ell, m), value in zip(modes, ylm):
+    assert value == sYlm(-2, ll=ell, mm=m, theta=0.4, phi=1.2)
+  assert EOBNRv2_sur.get_ylm_table(0.4, 1.2, modes) is ylm
+
+  # a new phi reuses the theta dependent factors
+  ylm = EOBNRv2_sur.get_ylm_table(0.4, -2.3, modes)
+  for (ell, m), value in zip(modes, ylm):
+    assert value == sYlm(-2, ll=ell, mm=m, theta=0.4, phi=-2.3)
+  assert len(EOBNRv2_sur._ylm_theta_cache) == 1
+
+def test_lazy_modes(surrogate_dir):
+  """ Lazily loaded modes are only built when used and agree with eager loading"""
+
+  eager_sur = gws.EvaluateSurrogate(surrogate_dir)
+  lazy_sur  = gws.EvaluateSurrogate(surrogate_dir, eager=False)
+  first, second = list(lazy_sur.single_mode_dict.keys())
+  assert lazy_sur.single_mode_dict.is_loaded(first)
+  assert not lazy_sur.single_mode_dict.is_loaded(second)
+
+  # values and items load each mode only once the iteration reaches it
+  for mode, single_mode in lazy_sur.single_mode_dict.items():
+    assert mode == first and single_mode is not None
+    break
+  assert next(iter(lazy_sur.single_mode_dict.values())) is not None
+  assert not lazy_sur.single_mode_dict.is_loaded(second)
+
+  # e.g. for process pools, unloaded modes stay unloaded in the copy
+  import pickle
+  lazy_copy = pickle.loads(pickle.dumps(lazy_sur))
+  assert not lazy_copy.single_mode_dict.is_loaded(second)
+
+  t, hp, hc = lazy_sur(q=1.3, theta=0.4, phi=0.2)
+  assert lazy_sur.single_mode_dict.is_loaded(second)
+  assert_waveforms_close(lazy_copy(q=1.3, theta=0.4, phi=0.2)[1:], (hp, hc))
+  assert_waveforms_close((hp, hc), eager_sur(q=1.3, theta=0.4, phi=0.2)[1:], 1.e-13)
+
+def test_write_waveform(tmp_path):
+  """ Waveforms written to binary and text files are read back unchanged"""
+
+  t = np.linspace(0., 1., 11)
+  hp, hc = np.sin(t), np.cos(t)
+  gws.surrogate.write_waveform(t, hp, hc, filename=str(tmp_path)+'/h.npy', ext='bin')
+  np.testing.assert_array_equal(np.load(str(tmp_path)+'/h.npy'), [t, hp, hc])
+  gws.surrogate.write_waveform(t, hp, hc, filename=str(tmp_path)+'/h.txt', ext='txt')
+  np.testing.assert_array_equal(np.loadtxt(str(tmp_path)+'/h.txt'), [t, hp, hc])
+
+def test_prefetch_h5_group(tmp_path):
+  """ Prefetched datasets read back as from the HDF5 file"""
+
+  import h5py
+  from gwsurrogate.surrogateIO import prefetch_h5_group
+
+  with h5py.File(str(tmp_path)+'/sur.h5', 'w') as fp:
+    fp['l2_m2/times'] = np.linspace(0., 1., 5)
+    fp['l2_m2/fit_min'] = 1.0
+    fp['l2_m2/spline/knots'] = np.arange(3)
+  with h5py.File(str(tmp_path)+'/sur.h5', 'r') as fp:
+    data = prefetch_h5_group(fp['l2_m2'], 'l2_m2/')
+    for name in ['l2_m2/times', 'l2_m2/spline/knots']:
+      np.testing.assert_array_equal(data[name][:], fp[name][:])
+    assert data['l2_m2/fit_min'][()] == fp['l2_m2/fit_min'][()]
+    data = prefetch_h5_group(fp['l2_m2'], 'l2_m2/', names=['times', 'spline', 'B'])
+    assert list(data.keys()) == ['l2_m2/times']
+
+def test_float32_fits(EOBNRv2_sur):
+  """ Single precision fit coefficients agree with double precision ones"""
+
+  sur32 = gws.EvaluateSurrogate(path_to_surrogate, fit_dtype=np.float32)
+
+  t, hp32, hc32 = sur32(q=1.3, theta=0.4, phi=0.2)
+  assert hp32.dtype == np.float64
+  assert_waveforms_close((hp32, hc32), EOBNRv2_sur(q=1.3, theta=0.4, phi=0.2)[1:], 1.e-4)
+
+def test_mode_threads(EOBNRv2_sur):
+  """ Modes evaluated by a thread pool agree with the serial mode loop"""
+
+  threaded_sur = gws.EvaluateSurrogate(path_to_surrogate, mode_threads=2)
+  times = np.linspace(EOBNRv2_sur.time_grid()[0], EOBNRv2_sur.time_grid()[-1], 1001)
+
+  modes, t, hp, hc = EOBNRv2_sur(q=1.3, times=times, mode_sum=False)
+  modes_th, t, hp_th, hc_th = threaded_sur(q=1.3, times=times, mode_sum=False)
+  assert modes_th == modes
+  assert_waveforms_close((hp_th, hc_th), (hp, hc))
+
+  # the pool is not pickled, the copy starts its own
+  import pickle
+  threaded_copy = pickle.loads(pickle.dumps(threaded_sur))
+  assert threaded_copy._mode_pool is not None
+  assert_waveforms_close(threaded_copy(q=1.3, times=times, mode_sum=False)[2:], (hp, hc))
+
+def test_accumulate_mode_kernel():
+  """ Compiled mode accumulation agrees with complex NumPy arithmetic"""
+
+  pytest.importorskip('numba')
+  from gwsurrogate._kernels import accumulate_mode
+
+  hp, hc = np.random.uniform(-1, 1, size=50), np.random.uniform(-1, 1, size=50)
+  h = np.random.uniform(-1, 1, size=50) + 1.j*np.random.uniform(-1, 1, size=50)
+  coef = 0.3 - 1.1j
+  expected = h + coef*(hp + 1.j*hc)
+  accumulate_mode(hp, hc, coef, h)
+  np.testing.assert_allclose(h, expected, rtol=0.0, atol=1.e-14)
+
+def test_output_buffers(EOBNRv2_sur):
+  """ Evaluations written into caller supplied arrays match fresh outputs"""
+
+  t, hp, hc = EOBNRv2_sur(q=1.3, theta=0.4, phi=0.2)
+  out_hp, out_hc = np.empty_like(hp), np.empty_like(hc)
+  t, hp_out, hc_out = EOBNRv2_sur(q=1.3, theta=0.4, phi=0.2, out_hp=out_hp, out_hc=out_hc)
+  assert hp_out is out_hp and hc_out is out_hc
+  assert_waveforms_close((out_hp, out_hc), (hp, hc))
+
+  modes, t, hp, hc = EOBNRv2_sur(q=1.3, mode_sum=False)
+  out_hp, out_hc = np.empty_like(hp), np.empty_like(hc)
+  EOBNRv2_sur(q=1.3, mode_sum=False, out_hp=out_hp, out_hc=out_hc)
+  assert_waveforms_close((out_hp, out_hc), (hp, hc))
+
+  # (samples, modes) arrays cannot hold the sum over modes
+  try:
+    EOBNRv2_sur(q=1.3, out_hp=out_hp, out_hc=out_hc)
+    assert False, 'expected a ValueError'
+  except ValueError:
+    pass
+
+  # nor can strided columns, which BLAS cannot write into
+  try:
+    EOBNRv2_sur(q=1.3, theta=0.4, phi=0.2, out_hp=out_hp[:,0], out_hc=out_hc[:,0])
+    assert False, 'expected a ValueError'
+  except ValueError:
+    pass
+
+def test_match_surrogate_slow(EOBNRv2_sur):
+  """ Matching by repeated surrogate evaluations recovers a known time shift and rotation"""
+
+  t_grid = EOBNRv2_sur.time_grid()
+  t_ref  = np.linspace(t_grid[0]+500., t_grid[-1]-100., 4000)
+  t, hp, hc = EOBNRv2_sur(q=1.4, theta=0.6, phi=0.0, z_rot=0.7, times=t_ref+3.3)
+
+  min_norm, (tc, phic), junk = EOBNRv2_sur.match_surrogate(t_ref, hp+1.j*hc, 1.4, theta=0.6, speed='slow')
+  assert abs(tc - 3.3) < 1.e-2
+  assert abs(np.angle(np.exp(1.j*(phic - 0.7)))) < 1.e-2
+
+def test_float32_output(EOBNRv2_sur):
+  """ Single precision evaluations agree with double precision ones"""
+
+  for kwargs in [dict(theta=0.4, phi=0.2, z_rot=0.3), dict(mode_sum=False, theta=0.4, phi=0.2)]:
+    out_32 = EOBNRv2_sur(q=1.3, dtype=np.float32, **kwargs)
+    assert out_32[-1].dtype == np.float32 and out_32[-2].dtype == np.float32
+    assert_waveforms_close(out_32[-2:], EOBNRv2_sur(q=1.3, **kwargs)[-2:], 1.e-5)
+
+def test_sylm_tol(EOBNRv2_sur):
+  """ Modes with a vanishing harmonic are skipped without changing the sum"""
+
+  # face-on, the (2,-2) harmonic vanishes
+  t, hp, hc = EOBNRv2_sur(q=1.3, theta=0.0, phi=0.2)
+  t, hp_tol, hc_tol = EOBNRv2_sur(q=1.3, theta=0.0, phi=0.2, sylm_tol=1.e-12)
+  t, hp_22, hc_22 = EOBNRv2_sur(q=1.3, theta=0.0, phi=0.2, ell=[2], m=[2], fake_neg_modes=False)
+  assert_waveforms_close((hp_tol, hc_tol), (hp_22, hc_22))
+  assert_waveforms_close((hp_tol, hc_tol), (hp, hc), 1.e-14)
+
+def test_match_surrogate_fft(EOBNRv2_sur):
+  """ Matching with shifted spectra recovers a known time shift and rotation"""
+
+  t_grid = EOBNRv2_sur.time_grid()
+  t_ref  = np.linspace(t_grid[0]+500., t_grid[-1]-100., 4000)
+  t, hp, hc = EOBNRv2_sur(q=1.4, theta=0.6, phi=0.0, z_rot=0.7, times=t_ref+3.3)
+
+  min_norm, (tc, phic), junk = EOBNRv2_sur.match_surrogate(t_ref, hp+1.j*hc, 1.4, theta=0.6, speed='fft')
+  assert abs(tc - 3.3) < 1.e-2
+  assert abs(np.angle(np.exp(1.j*(phic - 0.7)))) < 1.e-2
+
+  # shifted by half a sample, through the merger, agrees with direct evaluation
+  time_sur, hp, hc = EOBNRv2_sur(q=1.4, theta=0.6, phi=0.0)
+  h_shifted = EOBNRv2_sur._fft_parameterized_waveform(1.4, None, None, 0.6, 'dimensionless', None, None,
+                                                      True, time_sur, t_ref)
+  dt = t_ref[1] - t_ref[0]
+  t, hp, hc = EOBNRv2_sur(q=1.4, theta=0.6, phi=0.3, times=t_ref-0.5*dt)
+  h, h_fft = hp+1.j*hc, h_shifted([-0.5*dt, 0.3])
+  np.testing.assert_allclose(h_fft, h, rtol=0.0, atol=1.e-5*np.max(np.abs(h)))
+  assert np.linalg.norm(h_fft - h) < 1.e-6*np.linalg.norm(h)
+
+def test_threaded_evaluation(surrogate_dir):
+  """ A surrogate shared by several threads agrees with serial evaluations"""
+
+  from concurrent.futures import ThreadPoolExecutor
+
+  single_mode_sur = gws.EvaluateSingleModeSurrogate(surrogate_dir+'l2_m2_len12239M_SurID19poly/')
+  multi_mode_sur  = gws.EvaluateSurrogate(surrogate_dir)
+  # the NumPy path, used whenever numba is missing
+  for sur in [single_mode_sur] + list(multi_mode_sur.single_mode_dict.values()):
+    sur._use_jit_eim = False
+  lazy_sur        = gws.EvaluateSurrogate(surrogate_dir, eager=False, mode_threads=2)
+  evaluations = [single_mode_sur,
+                 lambda q: multi_mode_sur(q, theta=0.4, phi=0.2),
+                 lambda q: multi_mode_sur(q, mode_sum=False),
+                 lambda q: lazy_sur(q, theta=0.4, phi=0.2)]
+
+  qs = np.tile(np.linspace(1.0, 2.0, 50), 4)
+  for evaluate in evaluations:
+    expected = [evaluate(q) for q in qs]
+    with ThreadPoolExecutor(max_workers=8) as ex:
+      results = list(ex.map(evaluate, qs))
+    for result, result_q in zip(results, expected):
+      assert_waveforms_close(result[-2:], result_q[-2:])
+
+def test_text_cache(tmp_path):
+  """ Text surrogates load the same from their binary cache as from text"""
+
+  from gwsurrogate.surrogateIO import TextSurrogateRead
+
+  sur_dir = path_to_surrogate+'l2_m2_len12239M_SurID19poly/'
+  cache_dir = str(tmp_path)+'/cache'
+  files = set(os.listdir(sur_dir))
+  t, hp, hc = gws.EvaluateSurrogate(path_to_surrogate)(q=1.3, theta=0.4, phi=0.2)
+  for ii in range(2): # writes, then reads, the cache
+    cached_sur = gws.EvaluateSurrogate(path_to_surrogate, text_cache=cache_dir)
+    t, hp_cached, hc_cached = cached_sur(q=1.3, theta=0.4, phi=0.2)
+    np.testing.assert_array_equal(hp_cached, hp)
+    np.testing.assert_array_equal(hc_cached, hc)
+  assert set(os.listdir(sur_dir)) == files
+  assert len(os.listdir(cache_dir)) > 0
+
+  # memory mapped on both a cache miss and a hit; kwargs are part of the key
+  reader = TextSurrogateRead.__new__(TextSurrogateRead)
+  reader._text_cache = str(tmp_path)+'/cache_B'
+  for ii in range(2):
+    B_1 = reader._cached_loadtxt(sur_dir+'B_1.txt', mmap_mode='r', ndmin=2)
+    assert isinstance(B_1, np.memmap)
+  eim = reader._cached_loadtxt(sur_dir+'eim_indices.txt', dtype=int)
+  assert eim.dtype == int
+  assert reader._cached_loadtxt(sur_dir+'eim_indices.txt').dtype == np.float64